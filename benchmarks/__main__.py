@@ -0,0 +1,260 @@
+"""Benchmarks for the hot paths of django-jsonform.
+
+Usage (from the repository root):
+
+    python benchmarks run [-k FILTER] [--save NAME] [--output FILE]
+    python benchmarks compare BASELINE [RESULTS] [-k FILTER] [--threshold 0.2]
+
+See benchmarks/README.md for details.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+import django
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINES_DIR = os.path.join(BENCHMARKS_DIR, 'baselines')
+
+# the benchmarks use the settings of the tests package. The repository root
+# is appended (not prepended) so that an installed django-jsonform release
+# is still benchmarked instead of the local code.
+sys.path.append(os.path.dirname(BENCHMARKS_DIR))
+
+# the shortest duration of a single timing sample, in seconds
+MIN_SAMPLE_TIME = 0.05
+
+REPEAT = 5
+
+
+def get_benchmarks():
+    """Returns a dict mapping the names of the benchmarks to functions
+    which prepare and return the function to be measured.
+    """
+    try:
+        from django_jsonform.compiler import compile_schema
+    except ImportError:
+        # releases before the schema compiler
+        compile_schema = None
+    from django_jsonform.utils import normalize_schema
+    from django_jsonform.validators import JSONSchemaValidator
+    from django_jsonform.widgets import JSONFormWidget
+    from data import make_wide, make_deep, make_union, make_array
+
+    def validate(schema, data):
+        validator = JSONSchemaValidator(schema)
+        validator(data) # compile the schema and check that the data is valid
+        return lambda: validator(data)
+
+    def compile(schema, data):
+        return lambda: compile_schema(schema)
+
+    def normalize(schema, data):
+        return lambda: normalize_schema(schema)
+
+    def render(schema, data):
+        widget = JSONFormWidget(schema)
+        value = json.dumps(data)
+        return lambda: widget.render('data', value)
+
+    cases = {
+        'wide.10': lambda: make_wide(10),
+        'wide.500': lambda: make_wide(500),
+        'deep.10': lambda: make_deep(10),
+        'deep.200': lambda: make_deep(200),
+        'union.2': lambda: make_union(2),
+        'union.50': lambda: make_union(50),
+        'array.100': lambda: make_array(100),
+        'array.10000': lambda: make_array(10000),
+    }
+
+    benchmarks = {}
+
+    for case_name, make_case in cases.items():
+        benchmarks['validate.%s' % case_name] = (validate, make_case)
+
+    for case_name in ('wide.500', 'deep.10', 'union.50'):
+        if compile_schema is not None:
+            benchmarks['compile.%s' % case_name] = (compile, cases[case_name])
+        benchmarks['normalize_schema.%s' % case_name] = (normalize, cases[case_name])
+
+    for case_name in ('wide.10', 'wide.500', 'array.100', 'array.10000'):
+        benchmarks['render.%s' % case_name] = (render, cases[case_name])
+
+    return {
+        name: (lambda prepare=prepare, make_case=make_case: prepare(*make_case()))
+        for name, (prepare, make_case) in benchmarks.items()
+    }
+
+
+def measure(func):
+    """Returns the best time per call in seconds and the peak memory
+    allocated during a call in bytes.
+    """
+    timer = timeit.Timer(func)
+
+    number = 1
+    while True:
+        duration = timer.timeit(number)
+        if duration >= MIN_SAMPLE_TIME:
+            break
+        number *= 2
+
+    best = min(timer.repeat(repeat=REPEAT, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        func()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return best, peak_memory
+
+
+def get_metadata():
+    import django_jsonform
+
+    return {
+        'django_jsonform': django_jsonform.__version__,
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+    }
+
+
+def run(name_filter=None, stream=sys.stdout):
+    results = {}
+
+    for name, prepare in get_benchmarks().items():
+        if name_filter and name_filter not in name:
+            continue
+
+        time, peak_memory = measure(prepare())
+        results[name] = {
+            'time': time,
+            'ops_per_sec': 1 / time,
+            'peak_memory': peak_memory,
+        }
+        stream.write('%-32s %12.1f ops/s %12s\n' % (name, 1 / time, format_size(peak_memory)))
+        stream.flush()
+
+    return {'metadata': get_metadata(), 'results': results}
+
+
+def compare(baseline, current, threshold):
+    """Prints the change of every benchmark which is present in both
+    results and returns the names of the benchmarks which are slower
+    (or use more memory) than the baseline by more than the threshold.
+    """
+    regressions = []
+
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print('%-32s (not in baseline)' % name)
+            continue
+
+        time_change = result['time'] / base['time'] - 1
+        memory_change = (result['peak_memory'] + 1) / (base['peak_memory'] + 1) - 1
+
+        flag = ''
+        if time_change > threshold or memory_change > threshold:
+            regressions.append(name)
+            flag = '  <-- regression'
+
+        print('%-32s time %+7.1f%%   memory %+7.1f%%%s' % (
+            name, time_change * 100, memory_change * 100, flag
+        ))
+
+    return regressions
+
+
+def load_results(name_or_path):
+    path = name_or_path
+    if not os.path.exists(path):
+        path = os.path.join(BASELINES_DIR, '%s.json' % name_or_path)
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def format_size(size):
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return '%.1f %s' % (size, unit)
+        size /= 1024
+    return '%.1f GiB' % size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python benchmarks')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmarks.')
+    run_parser.add_argument('-k', dest='filter', help='Only run the benchmarks whose names contain this.')
+    run_parser.add_argument('--save', metavar='NAME', help='Save the results as a baseline with this name.')
+    run_parser.add_argument('--output', metavar='FILE', help='Write the results to this file.')
+
+    compare_parser = subparsers.add_parser(
+        'compare', help='Compare the results of the benchmarks against a baseline.'
+    )
+    compare_parser.add_argument('baseline', help='Name of a saved baseline or path to a results file.')
+    compare_parser.add_argument(
+        'results', nargs='?',
+        help='Path to a results file. If not given, the benchmarks are run.'
+    )
+    compare_parser.add_argument('-k', dest='filter', help='Only run the benchmarks whose names contain this.')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='Fail if a benchmark is slower or uses more memory by more than this ratio (default: 0.2).'
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        results = run(args.filter)
+        if args.save:
+            os.makedirs(BASELINES_DIR, exist_ok=True)
+            save_results(results, os.path.join(BASELINES_DIR, '%s.json' % args.save))
+        if args.output:
+            save_results(results, args.output)
+        return 0
+
+    baseline = load_results(args.baseline)
+    if args.results:
+        current = load_results(args.results)
+    else:
+        current = run(args.filter, stream=open(os.devnull, 'w'))
+
+    if baseline['metadata'] != current['metadata']:
+        print('Note: the results were recorded in different environments:')
+        print('  baseline: %s' % json.dumps(baseline['metadata'], sort_keys=True))
+        print('  current:  %s' % json.dumps(current['metadata'], sort_keys=True))
+
+    regressions = compare(baseline, current, args.threshold)
+
+    if regressions:
+        print('\n%s benchmark(s) regressed by more than %s%%.' % (len(regressions), args.threshold * 100))
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.django_settings')
+    django.setup()
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Synthetic schemas and documents for the benchmarks.
+
+Every generator returns a ``(schema, data)`` pair where the data is valid
+against the schema, so the whole document is walked by the validator.
+"""
+
+
+def make_wide(width):
+    """An object with ``width`` properties of different types."""
+    properties = {}
+    data = {}
+
+    for index in range(width):
+        kind = index % 4
+        key = 'field_%s' % index
+
+        if kind == 0:
+            properties[key] = {'type': 'string', 'maxLength': 50, 'pattern': '^[a-z]'}
+            data[key] = 'value %s' % index
+        elif kind == 1:
+            properties[key] = {'type': 'integer', 'minimum': 0, 'multipleOf': 1}
+            data[key] = index
+        elif kind == 2:
+            properties[key] = {'type': 'number', 'maximum': 1e9, 'multipleOf': 0.01}
+            data[key] = index + 0.25
+        else:
+            properties[key] = {'type': 'boolean'}
+            data[key] = bool(index % 2)
+
+    return {'type': 'object', 'properties': properties}, data
+
+
+def make_deep(depth):
+    """A recursive tree (using $ref) nested ``depth`` levels deep."""
+    schema = {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string'},
+            'children': {'type': 'array', 'items': {'$ref': '#/$defs/node'}},
+        },
+        '$defs': {
+            'node': {
+                'type': 'object',
+                'properties': {
+                    'name': {'type': 'string', 'minLength': 1},
+                    'children': {'type': 'array', 'items': {'$ref': '#/$defs/node'}},
+                },
+            },
+        },
+    }
+
+    data = {'name': 'leaf', 'children': []}
+    for level in range(depth - 1):
+        data = {'name': 'level %s' % level, 'children': [data, {'name': 'leaf', 'children': []}]}
+
+    return schema, data
+
+
+def make_union(fan_out, size=100):
+    """An array of ``size`` items each matching one of ``fan_out`` oneOf
+    branches. The items match the last branches, so most of the branches
+    have to be tried (there is no discriminator).
+    """
+    branches = [
+        {
+            'type': 'object',
+            'properties': {
+                'kind': {'type': 'string', 'choices': ['kind_%s' % index]},
+                'value_%s' % index: {'type': 'integer'},
+            },
+            'required': ['value_%s' % index],
+        }
+        for index in range(fan_out)
+    ]
+    schema = {'type': 'array', 'items': {'oneOf': branches}}
+
+    data = []
+    for index in range(size):
+        branch = fan_out - 1 - index % 2 if fan_out > 1 else 0
+        data.append({'kind': 'kind_%s' % branch, 'value_%s' % branch: index})
+
+    return schema, data
+
+
+def make_array(size):
+    """An array of ``size`` small objects plus a numeric array of the
+    same size.
+    """
+    schema = {
+        'type': 'object',
+        'properties': {
+            'items': {
+                'type': 'array',
+                'minItems': 1,
+                'items': {
+                    'type': 'object',
+                    'properties': {
+                        'sku': {'type': 'string', 'maxLength': 20},
+                        'quantity': {'type': 'integer', 'minimum': 1},
+                        'date': {'type': 'string', 'format': 'date'},
+                    },
+                },
+            },
+            'prices': {'type': 'array', 'items': {'type': 'number', 'minimum': 0}},
+        },
+    }
+
+    data = {
+        'items': [
+            {'sku': 'SKU-%s' % index, 'quantity': index + 1, 'date': '2022-01-%02d' % (index % 28 + 1)}
+            for index in range(size)
+        ],
+        'prices': [index * 1.5 for index in range(size)],
+    }
+
+    return schema, data
@@ -0,0 +1,576 @@
+"""Generates Python modules with precompiled validators.
+
+The generated code does the same checks as the compiled nodes (see the
+compiler module), but as plain functions with the keyword values written
+into the code. The modules are written by the ``jsonform_compile``
+management command and loaded by the validators through the
+PRECOMPILED_VALIDATORS setting.
+
+Nodes which the generator doesn't support (e.g. oneOf/anyOf) are
+validated by the interpreter: the generated code calls the node at the
+same position in the interpreter's tree of the schema.
+"""
+import ast
+import importlib
+import json
+import os
+import threading
+from django_jsonform.compiler import (compile_schema, TrialContext,
+    Node, NumberNode, IntegerNode)
+from django_jsonform.utils import normalize_schema, get_schema_fingerprint, get_setting
+
+
+# Changing the generated code requires bumping this version. Modules
+# generated by other versions are ignored.
+CODEGEN_VERSION = 2
+
+
+MODULE_HEADER = '''\
+# Generated by django-jsonform's jsonform_compile command. Do not edit.
+#
+# Regenerate this file when the schema changes; validators ignore it
+# if the schema's fingerprint doesn't match.
+import json
+import re
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django_jsonform.codegen import Interpreter
+from django_jsonform.compiler import (ChoiceSet, ArrayNode, ObjectNode,
+    type_mismatch_error, get_date, get_time, get_datetime, get_decimal_ratio,
+    TIME_CHECK_INTERVAL)
+from django_jsonform.exceptions import JSONSchemaValidationError
+from django_jsonform.utils import Coords
+
+
+CODEGEN_VERSION = %(version)r
+
+FINGERPRINT = %(fingerprint)r
+
+SCHEMA = json.loads(%(schema)r)
+
+interpreter = Interpreter(SCHEMA)
+'''
+
+
+class Unsupported(Exception):
+    """Raised by the generator for the nodes which must be validated
+    by the interpreter.
+    """
+    pass
+
+
+def get_module_name(fingerprint):
+    return 'schema_%s' % fingerprint
+
+
+class Interpreter:
+    """Compiles the schema of a generated module for the nodes which
+    are validated by the interpreter.
+
+    The schema is compiled on first use and only once per module.
+    """
+    def __init__(self, schema):
+        self.schema = schema
+        self.root = None
+        self.lock = threading.Lock()
+
+    def get_root(self):
+        if self.root is None:
+            with self.lock:
+                if self.root is None:
+                    self.root = compile_schema(self.schema)
+        return self.root
+
+    def node(self, path):
+        return FallbackNode(self, path)
+
+
+class FallbackNode:
+    """A node of the interpreter's tree, looked up by its path from the
+    root, e.g. (('properties', 'pet'), ('combinators', 0)).
+    """
+    def __init__(self, interpreter, path):
+        self.interpreter = interpreter
+        self.path = path
+        self.target = None
+
+    def get_node(self):
+        if self.target is None:
+            node = self.interpreter.get_root()
+            for attr, key in self.path:
+                node = getattr(node, attr)
+                if key is not None:
+                    node = node[key]
+            self.target = node
+        return self.target
+
+    def validate(self, data, coords, context):
+        self.get_node().validate(data, coords, context)
+
+
+class PrecompiledSchema(Node):
+    """Root node for a schema which has a generated module."""
+    def __init__(self, module):
+        self.required = False
+        self.module = module
+
+    def validate(self, data, coords, context):
+        self.module.validate(data, coords, context)
+
+    def is_valid(self, data):
+        context = TrialContext()
+        try:
+            self.module.validate(data, None, context)
+        except Exception:
+            return False
+        return not context.error_count
+
+
+def load_precompiled_schema(fingerprint):
+    """Returns a PrecompiledSchema for the given schema fingerprint.
+
+    Returns None if the PRECOMPILED_VALIDATORS setting isn't set or
+    there's no up to date module for the schema.
+    """
+    package = get_setting('PRECOMPILED_VALIDATORS', None)
+    if not package:
+        return None
+
+    try:
+        module = importlib.import_module('%s.%s' % (package, get_module_name(fingerprint)))
+    except ImportError:
+        return None
+
+    if (
+        getattr(module, 'CODEGEN_VERSION', None) != CODEGEN_VERSION
+        or getattr(module, 'FINGERPRINT', None) != fingerprint
+    ):
+        return None
+
+    return PrecompiledSchema(module)
+
+
+def literal(value):
+    """Returns the Python source for the given value.
+
+    Raises Unsupported if the value can't be written as a literal
+    (e.g. infinity or objects other than JSON types).
+    """
+    source = repr(value)
+    try:
+        if ast.literal_eval(source) != value:
+            raise Unsupported
+    except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+        raise Unsupported
+    return source
+
+
+class CodeGenerator:
+    """Generates the source of a module which validates data against
+    the given schema.
+    """
+    def __init__(self, schema):
+        self.schema = normalize_schema(schema)
+        self.fingerprint = get_schema_fingerprint(self.schema)
+        self.root = compile_schema(self.schema)
+
+        self.functions = {} # id(node) -> function name
+        self.blocks = []
+        self.constants = []
+        self.footer = []
+        self.fallback_count = 0
+
+    def generate(self):
+        """Returns the source code of the module."""
+        root_function = self.get_function(self.root, ())
+
+        source = MODULE_HEADER % {
+            'version': CODEGEN_VERSION,
+            'fingerprint': self.fingerprint,
+            'schema': json.dumps(self.schema, default=str),
+        }
+
+        if self.constants:
+            source += '\n' + '\n'.join(self.constants) + '\n'
+
+        for block in self.blocks:
+            source += '\n\n' + '\n'.join(block) + '\n'
+
+        if self.footer:
+            source += '\n\n' + '\n'.join(self.footer) + '\n'
+
+        source += '\n\n' + '\n'.join([
+            'def validate(data, coords, context):',
+            '    %s(data, coords, context)' % root_function,
+        ]) + '\n'
+
+        return source
+
+    def add_constant(self, source):
+        name = 'K%s' % len(self.constants)
+        self.constants.append('%s = %s' % (name, source))
+        return name
+
+    def get_function(self, node, path):
+        """Returns the name of the function (or the fallback node's
+        validate method) which validates the data against the node.
+        """
+        if id(node) in self.functions:
+            return self.functions[id(node)]
+
+        name = 'v%s' % len(self.functions)
+        self.functions[id(node)] = name
+
+        emitter = getattr(self, 'emit_%s' % type(node).__name__, None)
+
+        # emitters add the blocks of the child nodes, so this block
+        # is added at the position reserved for it
+        position = len(self.blocks)
+        self.blocks.append(None)
+        constant_count = len(self.constants)
+
+        try:
+            if emitter is None:
+                raise Unsupported
+            # emitters raise Unsupported (if at all) before they
+            # generate the functions of the child nodes
+            self.blocks[position] = ['def %s(data, coords, context):' % name] + emitter(node, path)
+        except Unsupported:
+            del self.blocks[position]
+            del self.constants[constant_count:]
+            self.fallback_count += 1
+            fallback = self.add_constant('interpreter.node(%s)' % literal(path))
+            self.functions[id(node)] = name = '%s.validate' % fallback
+
+        return name
+
+    def add_error(self, message, coords='coords', indent=1):
+        return '%scontext.add_error(%s, %s)' % ('    ' * indent, coords, literal(message))
+
+    def emit_StringNode(self, node, path):
+        lines = [
+            '    if not isinstance(data, str):',
+        ]
+        if node.required:
+            lines += [
+                '        if not data:',
+                self.add_error('This field is required.', indent=3),
+                '            return',
+            ]
+        lines += [
+            self.add_error('This value is invalid. Must be a valid string.', indent=2),
+            '        return',
+            '    context.check_string(data)',
+            '    if not data.strip():',
+        ]
+        if node.required:
+            lines.append(self.add_error('This field is required.', indent=2))
+        lines.append('        return')
+
+        if node.choices is not None:
+            lines += [
+                '    if data not in %s:' % self.choices_constant(node.choices),
+                "        context.add_error(coords, 'Invalid choice \"%s\"' % data)",
+                '        return',
+            ]
+
+        for keyword, check in node.checks:
+            check_name = check.__func__.__name__
+
+            if check_name == 'check_min_length':
+                lines += [
+                    '    if len(data) < %s:' % literal(node.min_length),
+                    self.add_error('Minumum length must be %s' % node.min_length, indent=2),
+                ]
+            elif check_name == 'check_max_length':
+                lines += [
+                    '    if len(data) > %s:' % literal(node.max_length),
+                    self.add_error('Maximum length must be %s' % node.max_length, indent=2),
+                ]
+            elif check_name == 'check_pattern':
+                pattern = self.add_constant('re.compile(%s)' % literal(node.pattern.pattern))
+                lines += [
+                    '    if not %s.search(data):' % pattern,
+                    self.add_error('This value does not match the required pattern.', indent=2),
+                ]
+            elif check_name == 'check_email':
+                lines += [
+                    '    try:',
+                    '        validate_email(data)',
+                    '    except ValidationError:',
+                    self.add_error('Enter a valid email address.', indent=2),
+                ]
+            elif check_name in ('check_date', 'check_time', 'check_datetime'):
+                function, name = {
+                    'check_date': ('get_date', 'date'),
+                    'check_time': ('get_time', 'time'),
+                    'check_datetime': ('get_datetime', 'date and time'),
+                }[check_name]
+                lines += [
+                    '    if not %s(data):' % function,
+                    self.add_error('Enter a valid %s.' % name, indent=2),
+                ]
+            else:
+                raise Unsupported
+
+        return lines
+
+    def emit_BooleanNode(self, node, path):
+        lines = ['    if data is None:']
+        if node.required:
+            lines.append(self.add_error('This field is required.', indent=2))
+        lines += [
+            '        return',
+            '    if not isinstance(data, bool):',
+            self.add_error('Invalid value.', indent=2),
+        ]
+        return lines
+
+    def emit_NumberNode(self, node, path):
+        lines = ['    if data is None:']
+        if node.required:
+            lines.append(self.add_error('This field is required.', indent=2))
+        lines.append('        return')
+
+        if isinstance(node, IntegerNode):
+            lines += [
+                '    if isinstance(data, float) and not data.is_integer() or isinstance(data, bool):',
+                self.add_error('Invalid value. Only integers allowed.', indent=2),
+                '        return',
+            ]
+
+        lines += [
+            '    if not isinstance(data, (float, int)) or isinstance(data, bool):',
+            self.add_error('Invalid value. Only numbers allowed.', indent=2),
+            '        return',
+        ]
+
+        if node.choices is not None:
+            lines += [
+                '    if data not in %s:' % self.choices_constant(node.choices),
+                "        context.add_error(coords, 'Invalid choice \"%s\"' % data)",
+                '        return',
+            ]
+
+        bounds = {
+            'check_minimum': ('<', 'This value must not be less than %s'),
+            'check_maximum': ('>', 'This value must not be greater than %s'),
+            'check_exclusiveMinimum': ('<=', 'This value must be greater than %s'),
+            'check_exclusiveMaximum': ('>=', 'This value must be less than %s'),
+        }
+
+        for keyword, check in node.checks:
+            check_name = check.__func__.__name__
+            message = 'This value must be a multiple of %s' % getattr(node, 'multipleOf', None)
+
+            if check_name in bounds:
+                operator, message = bounds[check_name]
+                value = getattr(node, keyword)
+                lines += [
+                    '    if data %s %s:' % (operator, literal(value)),
+                    self.add_error(message % value, indent=2),
+                ]
+            elif check_name == 'check_multipleOf_int':
+                value = literal(node.multipleOf)
+                lines += [
+                    '    if data %% %s if isinstance(data, int) else not data.is_integer() or int(data) %% %s:' % (value, value),
+                    self.add_error(message, indent=2),
+                ]
+            elif check_name == 'check_multipleOf':
+                numerator, denominator = node.multiple_of_ratio
+                lines += [
+                    '    try:',
+                    '        numerator, denominator = get_decimal_ratio(data)',
+                    '    except (ValueError, OverflowError):',
+                    self.add_error(message, indent=2),
+                    '    else:',
+                    '        if (numerator * %s) %% (denominator * %s):' % (literal(denominator), literal(numerator)),
+                    self.add_error(message, indent=3),
+                ]
+            else:
+                raise Unsupported
+
+        return lines
+
+    emit_IntegerNode = emit_NumberNode
+
+    def emit_ConstNode(self, node, path):
+        return [
+            '    if data != %s:' % self.add_constant(literal(node.const)),
+            self.add_error('Constant values cannot be changed', indent=2),
+        ]
+
+    def emit_ArrayNode(self, node, path):
+        lines = [
+            '    if not isinstance(data, list):',
+            '        raise type_mismatch_error(ArrayNode.type_error_message, data)',
+            '    context.enter(data)',
+        ]
+
+        if node.min_items:
+            lines += [
+                '    if len(data) < %s:' % literal(node.min_items),
+                self.add_error('Minimum %s items required.' % node.min_items, indent=2),
+            ]
+
+        if node.max_items:
+            lines += [
+                '    if len(data) > %s:' % literal(node.max_items),
+                self.add_error('Maximum %s items allowed.' % node.max_items, indent=2),
+            ]
+
+        if node.unique_items:
+            lines += [
+                '    duplicates = ArrayNode.find_duplicates(data)',
+                '    if duplicates:',
+                self.add_error('All items in this list must be unique.', indent=2),
+                '        for index, first_index in duplicates:',
+                "            context.add_error(Coords(coords, index), 'This item is a duplicate of item %s.' % (first_index + 1))",
+            ]
+
+        if node.choices is not None:
+            lines += [
+                '    for item in data:',
+                '        if item not in %s:' % self.choices_constant(node.choices),
+                "            context.add_error(coords, 'Invalid choice %s' % item)",
+                '            break',
+            ]
+
+        items = self.get_function(node.items, path + (('items', None),))
+
+        try:
+            batch = self.get_batch_condition(node.items)
+        except Unsupported:
+            batch = None
+
+        indent = '    '
+        if batch:
+            lines.append('    if not (%s):' % batch)
+            indent = '        '
+
+        lines += [
+            indent + 'check_time = context.deadline is not None',
+            indent + 'for index, item in enumerate(data):',
+            indent + '    if check_time and not index % TIME_CHECK_INTERVAL:',
+            indent + '        context.check_time()',
+            indent + '    %s(item, Coords(coords, index), context)' % items,
+            '    context.leave()',
+        ]
+        return lines
+
+    def get_batch_condition(self, node):
+        """Returns an expression which is true when all the items of the
+        list named ``data`` are valid for the given number node (see
+        NumberNode.is_valid_batch).
+        """
+        if type(node) not in (NumberNode, IntegerNode) or node.choices is not None:
+            return None
+
+        if not node.checks:
+            return 'data and set(map(type, data)) <= %s' % self.batch_types(node)
+
+        if hasattr(node, 'multipleOf'):
+            if not isinstance(node.multipleOf, int):
+                return None
+            conditions = [
+                'data and set(map(type, data)) == {int}',
+                'not any(map((%s).__rmod__, data))' % literal(node.multipleOf),
+            ]
+        else:
+            conditions = ['data and set(map(type, data)) <= %s' % self.batch_types(node)]
+
+        # min() and max() of the list return nan only if the first item is nan
+        conditions.append('data[0] == data[0]')
+
+        for attr, function, operator in (
+            ('minimum', 'min', '>='),
+            ('exclusiveMinimum', 'min', '>'),
+            ('maximum', 'max', '<='),
+            ('exclusiveMaximum', 'max', '<'),
+        ):
+            if hasattr(node, attr):
+                conditions.append('%s(data) %s %s' % (function, operator, literal(getattr(node, attr))))
+
+        return ' and '.join(conditions)
+
+    def batch_types(self, node):
+        return '{int}' if isinstance(node, IntegerNode) else '{int, float}'
+
+    def emit_ObjectNode(self, node, path):
+        if node.pattern_properties:
+            raise Unsupported
+
+        properties = self.add_constant('{}')
+        keys = [literal(key) for key in node.properties]
+        required_keys = 'frozenset(%s)' % literal(sorted(node.required_keys, key=str))
+
+        lines = [
+            '    if not isinstance(data, dict):',
+            '        raise type_mismatch_error(ObjectNode.type_error_message, data)',
+            '    if not %s.keys() <= data.keys():' % properties,
+            '        raise JSONSchemaValidationError(',
+            '            ObjectNode.missing_keys_message,',
+            "            params={'fields': ', '.join(%s.keys() - data.keys())}" % properties,
+            '        )',
+            '    context.enter(data)',
+        ]
+
+        functions = []
+        for key, (child_key, child) in zip(keys, node.properties.items()):
+            functions.append((key, self.get_function(child, path + (('properties', child_key),))))
+
+        if functions or node.additional is not None:
+            lines += [
+                '    check_time = context.deadline is not None',
+                '    for index, key in enumerate(data):',
+                '        if check_time and not index % TIME_CHECK_INTERVAL:',
+                '            context.check_time()',
+                '        if key in %s:' % properties,
+                '            %s[key](data[key], Coords(coords, key), context)' % properties,
+            ]
+
+        if node.additional is not None:
+            additional = self.get_function(node.additional, path + (('additional', None),))
+            additional_required = self.get_function(
+                node.additional_required, path + (('additional_required', None),)
+            )
+            if additional_required != additional:
+                lines += [
+                    '        elif key in %s:' % self.add_constant(required_keys),
+                    '            %s(data[key], Coords(coords, key), context)' % additional_required,
+                ]
+            lines += [
+                '        else:',
+                '            %s(data[key], Coords(coords, key), context)' % additional,
+            ]
+
+        for index, combinator in enumerate(node.combinators):
+            function = self.get_function(combinator, path + (('combinators', index),))
+            lines.append('    %s(data, coords, context)' % function)
+
+        lines.append('    context.leave()')
+
+        self.footer.append('%s.update({%s})' % (
+            properties, ', '.join('%s: %s' % item for item in functions)
+        ))
+
+        return lines
+
+    def choices_constant(self, choices):
+        values = list(choices.values) + list(choices.unhashable_values)
+        return self.add_constant('ChoiceSet(%s)' % literal(values))
+
+
+def write_module(schema, directory):
+    """Generates the module for the schema and writes it to the given
+    directory. Returns the CodeGenerator used.
+    """
+    generator = CodeGenerator(schema)
+    source = generator.generate()
+
+    path = os.path.join(directory, '%s.py' % get_module_name(generator.fingerprint))
+    with open(path, 'w') as f:
+        f.write(source)
+
+    generator.path = path
+    return generator
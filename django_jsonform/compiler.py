@@ -0,0 +1,1623 @@
+"""Compiles a JSON schema into a tree of validation nodes.
+
+The schema is interpreted only once, at compile time. Every node keeps the
+keyword values it needs and the nodes of its subschemas (with the type
+dispatch and ``$ref`` lookups already done), so validating data only
+runs the prebuilt checks.
+"""
+import datetime
+import re
+import threading
+import time
+from decimal import Decimal
+from functools import lru_cache, wraps
+from urllib.parse import unquote
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext, gettext_lazy as _
+from django.utils import timezone
+from django_jsonform.exceptions import JSONSchemaValidationError
+from django_jsonform.utils import (normalize_schema, normalize_keyword,
+    get_schema_type, get_schema_fingerprint, get_setting, find_duplicates,
+    Coords, ErrorMap, LRUCache)
+
+
+# Default number of compiled schemas kept in memory
+# (see VALIDATOR_CACHE_SIZE setting)
+DEFAULT_CACHE_SIZE = 128
+
+
+# Maximum number of parsed date and time values kept in memory
+# (schedules etc. tend to repeat the same values)
+DATE_CACHE_SIZE = 1024
+
+# Only the values up to this length are cached. Dates and times are
+# shorter than this (unless they have long fractions of seconds)
+DATE_CACHE_MAX_LENGTH = 32
+
+# These accept exactly what strptime accepts for the
+# '%Y-%m-%d', '%H:%M' and '%H:%M:%S' formats (the field patterns
+# are the same as in the _strptime module), without its overhead
+DATE_RE = re.compile(r'(\d\d\d\d)-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])\Z')
+TIME_RE = re.compile(r'(2[0-3]|[0-1]\d|\d):([0-5]\d|\d)(?::(6[0-1]|[0-5]\d|\d))?\Z')
+
+# Code of the errors raised when the data goes over a resource limit
+LIMIT_EXCEEDED = 'limit_exceeded'
+
+# The time limit is checked after this many items of an array or object
+TIME_CHECK_INTERVAL = 100
+
+
+def cache_short_values(func):
+    """Caches the results of a date or time parser.
+
+    Longer values are parsed every time without being cached, so that
+    large strings from the data can't pile up in the cache.
+    """
+    cached_func = lru_cache(maxsize=DATE_CACHE_SIZE)(func)
+
+    @wraps(func)
+    def wrapper(value):
+        if len(value) > DATE_CACHE_MAX_LENGTH:
+            return func(value)
+        return cached_func(value)
+
+    wrapper.cache_info = cached_func.cache_info
+    wrapper.cache_clear = cached_func.cache_clear
+    return wrapper
+
+
+@cache_short_values
+def get_date(value):
+    """Returns datetime.date object for the given ``value``.
+    Returns None if unable to parse.
+
+    The value must be in YYYY-MM-DD format.
+    """
+    match = DATE_RE.match(value)
+    if not match:
+        return None
+
+    try:
+        return datetime.date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+@cache_short_values
+def get_time(value):
+    """Returns datetime.time object for the given ``value``.
+    Returns None if unable to parse.
+
+    The value must be in HH:MM:SS or HH:MM format.
+    """
+    match = TIME_RE.match(value)
+    if not match:
+        return None
+
+    hour, minute, second = match.groups()
+
+    try:
+        return datetime.time(int(hour), int(minute), int(second or 0))
+    except ValueError:
+        return None
+
+
+@cache_short_values
+def get_datetime(value):
+    """Returns datetime.datetime object for the given ``value``.
+    Returns None if unable to parse.
+
+    The value must be in ISO format.
+    """
+    try:
+        return timezone.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def get_decimal_ratio(value):
+    """Returns the given number as a (numerator, denominator) pair of
+    integers.
+
+    Floats are converted using their shortest decimal representation,
+    i.e. 0.07 becomes (7, 100) and not the exact binary value of 0.07.
+    """
+    if isinstance(value, int):
+        return value, 1
+    return Decimal(repr(value)).as_integer_ratio()
+
+
+def get_choice_values(choices):
+    """Returns values for given choices.
+
+    Useful for extracting choice values for object choices.
+    """
+    values = []
+    for choice in choices:
+        if isinstance(choice, dict):
+            choice = choice.get('value', '')
+        values.append(choice)
+    return values
+
+
+class ChoiceSet:
+    """Choice values prepared for fast membership tests.
+
+    Hashable values are looked up in a frozenset. Unhashable ones (lists
+    and dicts) are rare, so they are kept in a tuple and compared one by one.
+    """
+    __slots__ = ('values', 'unhashable_values')
+
+    def __init__(self, values):
+        hashable_values = []
+        unhashable_values = []
+
+        for value in values:
+            try:
+                hash(value)
+            except TypeError:
+                unhashable_values.append(value)
+            else:
+                hashable_values.append(value)
+
+        self.values = frozenset(hashable_values)
+        self.unhashable_values = tuple(unhashable_values)
+
+    def __contains__(self, value):
+        try:
+            if value in self.values:
+                return True
+        except TypeError:
+            # value is unhashable
+            pass
+
+        return bool(self.unhashable_values) and value in self.unhashable_values
+
+
+def get_choices(schema):
+    """Returns the choice values declared in the schema (either with the
+    ``choices`` or the ``enum`` keyword) as a ChoiceSet or None if there
+    aren't any.
+    """
+    choices = schema.get('choices', schema.get('enum', None))
+
+    if not choices:
+        return None
+
+    return ChoiceSet(get_choice_values(choices))
+
+
+def get_ref_tokens(ref):
+    """Returns the list of keys (tokens) of a $ref's JSON Pointer.
+
+    Only references to the same schema are supported, e.g.
+    "#/$defs/address". The pointer may be percent-encoded and, as per
+    RFC 6901, uses "~1" for "/" and "~0" for "~" inside keys.
+    """
+    pointer = unquote(ref)
+
+    if pointer.startswith('#'):
+        pointer = pointer[1:]
+
+    if pointer.startswith('/'):
+        pointer = pointer[1:]
+    elif not pointer:
+        # reference to the whole schema
+        return []
+
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer.split('/')]
+
+
+def is_unchanged(data, initial):
+    """Returns True if the data is exactly the same as the initial value.
+
+    Python considers 1, 1.0 and True equal, so the values must also be
+    of the same types. Dicts with a different key order are the same.
+    The values are compared using a stack and it stops at the first
+    difference.
+    """
+    stack = [(data, initial)]
+
+    while stack:
+        data, initial = stack.pop()
+
+        if data is initial:
+            continue
+
+        if type(data) is not type(initial):
+            return False
+
+        if type(data) is dict:
+            if len(data) != len(initial):
+                return False
+            for key, value in data.items():
+                if key not in initial:
+                    return False
+                stack.append((value, initial[key]))
+        elif type(data) is list:
+            if len(data) != len(initial):
+                return False
+            stack.extend(zip(data, initial))
+        elif data != initial:
+            return False
+
+    return True
+
+
+def compile_pattern(pattern):
+    """Compiles the regex of a ``pattern`` or ``patternProperties`` keyword."""
+    try:
+        return re.compile(pattern)
+    except re.error:
+        raise JSONSchemaValidationError(
+            _('Invalid regular expression "%(pattern)s" in the schema.'),
+            params={'pattern': pattern}
+        )
+
+
+def type_mismatch_error(message, data):
+    data_type = type(data).__name__
+    data_type_norm = normalize_keyword(data_type)
+    return JSONSchemaValidationError(
+        message,
+        params={'schema_type': '%s (%s)' % (data_type_norm, data_type) if data_type_norm else data_type}
+    )
+
+
+class StopValidation(Exception):
+    """Raised by ValidationContext to stop the validation run early."""
+    pass
+
+
+class ValidationContext:
+    """Holds the state of a single validation run.
+
+    A new context is created for every run and passed down to the nodes,
+    so the compiled nodes (and the validators using them) don't keep any
+    state and can be used from multiple threads at once.
+
+    If ``max_errors`` is given, at most that many errors are kept. The run
+    is stopped (by raising StopValidation) at the next error, which is
+    dropped and the error_map is marked as truncated. ``fail_fast`` is
+    the same as ``max_errors=1``.
+
+    The resource limits (``max_depth``, ``max_nodes``, ``max_string_length``
+    and ``time_limit`` in seconds) are checked by the nodes as they walk
+    the data. Going over a limit fails the whole data: the error is raised
+    with the ``limit_exceeded`` code.
+    """
+    def __init__(
+        self, max_errors=None, fail_fast=False, max_depth=None, max_nodes=None,
+        max_string_length=None, time_limit=None
+    ):
+        self.error_map = ErrorMap()
+        self.error_count = 0
+        self.max_errors = 1 if fail_fast else max_errors
+
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_string_length = max_string_length
+        self.deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self.depth = 0
+        self.node_count = 1 # the top level data
+
+    def add_error(self, coords, msg):
+        """Add a field's error to the error_map.
+
+        ``coords`` is a Coords instance (or None for the top level data).
+        The error_map can be used for displaying error on the form page.
+        """
+        if self.max_errors is not None and self.error_count >= self.max_errors:
+            # the error doesn't fit in the budget
+            self.error_map.truncated = True
+            raise StopValidation
+
+        self.error_map.append(coords=coords.to_list() if coords else [], msg=msg)
+        self.error_count += 1
+
+    def enter(self, data):
+        """Called by the nodes before validating the items of an
+        array or an object. Checks the depth, node count and time limits.
+        """
+        self.depth += 1
+
+        if self.max_depth is not None and self.depth > self.max_depth:
+            raise JSONSchemaValidationError(
+                _('The data is nested too deeply. Maximum allowed depth is %(max_depth)s.'),
+                code=LIMIT_EXCEEDED,
+                params={'max_depth': self.max_depth}
+            )
+
+        self.add_nodes(len(data))
+
+    def add_nodes(self, count):
+        """Counts the values found in the data. Checks the node count
+        and time limits.
+        """
+        self.node_count += count
+
+        if self.max_nodes is not None and self.node_count > self.max_nodes:
+            raise JSONSchemaValidationError(
+                _('The data is too large. Maximum %(max_nodes)s values are allowed.'),
+                code=LIMIT_EXCEEDED,
+                params={'max_nodes': self.max_nodes}
+            )
+
+        self.check_time()
+
+    def check_time(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise JSONSchemaValidationError(
+                _('The data took too long to validate.'), code=LIMIT_EXCEEDED
+            )
+
+    def leave(self):
+        self.depth -= 1
+
+    def check_string(self, data):
+        if self.max_string_length is not None and len(data) > self.max_string_length:
+            raise JSONSchemaValidationError(
+                _('The data contains a value longer than %(max_length)s characters.'),
+                code=LIMIT_EXCEEDED,
+                params={'max_length': self.max_string_length}
+            )
+
+    def has_limits(self):
+        return (
+            self.max_depth is not None or self.max_nodes is not None
+            or self.max_string_length is not None or self.deadline is not None
+        )
+
+    def trial(self):
+        """Returns a context for trying whether the data matches a subschema
+        (e.g. a branch of oneOf) with the same limits as this context.
+        """
+        trial = TrialContext()
+        trial.max_depth = self.max_depth
+        trial.max_nodes = self.max_nodes
+        trial.max_string_length = self.max_string_length
+        trial.deadline = self.deadline
+        trial.depth = self.depth
+        trial.node_count = self.node_count
+        return trial
+
+
+class TrialContext(ValidationContext):
+    """Context for trying whether the data matches a subschema.
+
+    It stops the validation at the first error. The error isn't recorded
+    (only ``error_count`` is increased) since nobody is going to see it.
+    """
+    def add_error(self, coords, msg):
+        self.error_count += 1
+        raise StopValidation
+
+
+class Node:
+    """Base class for compiled schema nodes.
+
+    The constructor only extracts the keyword values from the schema.
+    The subschemas are compiled in the ``link`` method which is called
+    after the node has been registered with the compiler. This allows
+    recursive references to point to the node being compiled.
+    """
+    def __init__(self, schema, required=False):
+        # if the schema doesn't say anything about being required,
+        # the parent object's "required" list decides it
+        self.required = bool(schema['required'] if 'required' in schema else required)
+
+    def link(self, compiler, schema):
+        pass
+
+    def validate(self, data, coords, context):
+        """Validates the data and adds the errors to the context.
+
+        Errors which make the whole data invalid are raised as
+        JSONSchemaValidationError.
+        """
+        raise NotImplementedError
+
+    def validate_node(self, data, coords, context):
+        """Validates the data against the keywords of this node only and
+        returns an iterable of ``(node, data, coords)`` for the values which
+        must be validated next (e.g. array items).
+
+        This lets the iterative engine walk the data without recursion.
+        Nodes which have no children to hand over validate the whole data
+        here and return an empty tuple.
+        """
+        self.validate(data, coords, context)
+        return ()
+
+    def validate_changes(self, data, initial, coords, context):
+        """Validates the parts of the data which differ from ``initial``.
+
+        The initial value is assumed to be valid. Container nodes run
+        their own checks (e.g. minItems, uniqueItems, oneOf) again and
+        skip the children which haven't changed. Other nodes validate
+        the whole data.
+        """
+        self.validate(data, coords, context)
+
+    def is_valid(self, data):
+        """Returns whether the data is valid.
+
+        This is a cheaper version of ``validate`` for when only the outcome
+        matters (e.g. trying the subschemas of oneOf): it stops at the first
+        problem and doesn't build error messages or exceptions for it.
+        """
+        raise NotImplementedError
+
+    def is_valid_batch(self, items):
+        """Returns True if all the items of a list are known to be valid.
+
+        Nodes which can check a whole list at once (faster than checking
+        every item) override this. False means that the items have to be
+        checked one by one, either because some are invalid (and errors
+        must be reported for them) or because the batch check isn't possible.
+        """
+        return False
+
+
+class ContainerNode(Node):
+    """Base class for the nodes which validate child values.
+
+    Subclasses implement ``validate_node`` as a generator which yields
+    the children after running the node's own checks. The same generator
+    is used by both the recursive and the iterative engines.
+    """
+    def validate(self, data, coords, context):
+        for node, value, value_coords in self.validate_node(data, coords, context):
+            node.validate(value, value_coords, context)
+
+    def validate_changes(self, data, initial, coords, context):
+        if type(data) is not type(initial):
+            self.validate(data, coords, context)
+            return
+
+        for node, value, value_coords in self.validate_node(data, coords, context):
+            if value_coords is not coords:
+                # an array item or an object property (the combinators
+                # get the same data and coords and are validated fully)
+                try:
+                    initial_value = initial[value_coords.key]
+                except (KeyError, IndexError):
+                    pass
+                else:
+                    if not is_unchanged(value, initial_value):
+                        node.validate_changes(value, initial_value, value_coords, context)
+                    continue
+
+            node.validate(value, value_coords, context)
+
+
+class LeafNode(Node):
+    """Base class for the nodes of primitive types.
+
+    Subclasses implement the ``check`` method which returns a list of
+    error messages for the given data or None if the data is valid.
+    """
+    def __init__(self, schema, required=False):
+        super().__init__(schema, required)
+        # a tuple of (keyword, check) pairs for the keywords present
+        # in the schema; a check returns an error message or None
+        self.checks = ()
+
+    def check(self, data):
+        raise NotImplementedError
+
+    def run_checks(self, data):
+        errors = None
+        for keyword, check in self.checks:
+            msg = check(data)
+            if msg:
+                if errors is None:
+                    errors = []
+                errors.append(msg)
+        return errors
+
+    def validate(self, data, coords, context):
+        errors = self.check(data)
+        if errors:
+            for msg in errors:
+                context.add_error(coords, msg)
+
+    def is_valid(self, data):
+        return not self.check(data)
+
+
+class StringNode(LeafNode):
+    def __init__(self, schema, required=False):
+        super().__init__(schema, required)
+        self.choices = get_choices(schema)
+
+        checks = []
+
+        if isinstance(schema.get('minLength'), int):
+            self.min_length = int(schema['minLength'])
+            checks.append(('minLength', self.check_min_length))
+
+        if isinstance(schema.get('maxLength'), int):
+            self.max_length = int(schema['maxLength'])
+            checks.append(('maxLength', self.check_max_length))
+
+        if isinstance(schema.get('pattern'), str):
+            self.pattern = compile_pattern(schema['pattern'])
+            checks.append(('pattern', self.check_pattern))
+
+        format_check = self.format_checks.get(normalize_keyword(schema.get('format')))
+        if format_check:
+            checks.append(('format', getattr(self, format_check)))
+
+        self.checks = tuple(checks)
+
+    format_checks = {
+        'email': 'check_email',
+        'date': 'check_date',
+        'time': 'check_time',
+        'date-time': 'check_datetime',
+    }
+
+    def validate(self, data, coords, context):
+        if isinstance(data, str):
+            context.check_string(data)
+        super().validate(data, coords, context)
+
+    def check(self, data):
+        if isinstance(data, str):
+            trimmed_data = data.strip()
+        else:
+            trimmed_data = data
+
+        is_empty = not trimmed_data
+
+        if self.required and is_empty:
+            return ['This field is required.']
+
+        if not isinstance(data, str):
+            return ['This value is invalid. Must be a valid string.']
+
+        if is_empty:
+            # data not required and is empty
+            return None
+
+        if self.choices is not None and data not in self.choices:
+            return ['Invalid choice "%s"' % data]
+
+        return self.run_checks(data)
+
+    def check_min_length(self, data):
+        if len(data) < self.min_length:
+            return 'Minumum length must be %s' % self.min_length
+
+    def check_max_length(self, data):
+        if len(data) > self.max_length:
+            return 'Maximum length must be %s' % self.max_length
+
+    def check_pattern(self, data):
+        if not self.pattern.search(data):
+            return 'This value does not match the required pattern.'
+
+    def check_email(self, data):
+        try:
+            validate_email(data)
+        except ValidationError:
+            return 'Enter a valid email address.'
+
+    def check_date(self, data):
+        if not get_date(data):
+            return 'Enter a valid date.'
+
+    def check_time(self, data):
+        if not get_time(data):
+            return 'Enter a valid time.'
+
+    def check_datetime(self, data):
+        if not get_datetime(data):
+            return 'Enter a valid date and time.'
+
+
+class BooleanNode(LeafNode):
+    def check(self, data):
+        if self.required and data is None:
+            return ['This field is required.']
+
+        if not isinstance(data, bool) and data is not None:
+            return ['Invalid value.']
+
+        return None
+
+
+class NumberNode(LeafNode):
+    def __init__(self, schema, required=False):
+        super().__init__(schema, required)
+        self.choices = get_choices(schema)
+
+        checks = []
+
+        for keyword in ('minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum'):
+            if isinstance(schema.get(keyword), (int, float)):
+                setattr(self, keyword, schema[keyword])
+                checks.append((keyword, getattr(self, 'check_%s' % keyword)))
+
+        multiple_of = schema.get('multipleOf')
+        if isinstance(multiple_of, (int, float)) and multiple_of > 0:
+            self.multipleOf = multiple_of
+            if isinstance(multiple_of, int):
+                checks.append(('multipleOf', self.check_multipleOf_int))
+            else:
+                # the value is compared as a fraction of integers,
+                # e.g. 0.01 -> 1/100, so that the check is exact
+                self.multiple_of_ratio = get_decimal_ratio(multiple_of)
+                checks.append(('multipleOf', self.check_multipleOf))
+
+        self.checks = tuple(checks)
+
+    # types of the items which can be checked in a batch
+    batch_types = frozenset([int, float])
+
+    def check(self, data):
+        if data is None:
+            # if not required, number can be None (or null)
+            return ['This field is required.'] if self.required else None
+
+        # must not be boolean
+        if not isinstance(data, (float, int)) or isinstance(data, bool):
+            return ['Invalid value. Only numbers allowed.']
+
+        if self.choices is not None and data not in self.choices:
+            return ['Invalid choice "%s"' % data]
+
+        return self.run_checks(data)
+
+    def is_valid_batch(self, items):
+        # the bounds are checked against the smallest and the largest item
+        # which min() and max() find much faster than checking every item
+        if self.choices is not None:
+            return False
+
+        if not items:
+            return False
+
+        types = set(map(type, items))
+        if not types <= self.batch_types:
+            return False
+
+        if not self.checks:
+            return True
+
+        if hasattr(self, 'multipleOf'):
+            if types != {int} or not isinstance(self.multipleOf, int):
+                return False
+            if any(map(self.multipleOf.__rmod__, items)):
+                return False
+
+        lowest = min(items)
+        highest = max(items)
+
+        if lowest != lowest or highest != highest:
+            # min() and max() return nan only if the first item is nan
+            # and then they don't tell anything about the rest
+            return False
+
+        if hasattr(self, 'minimum') and lowest < self.minimum:
+            return False
+
+        if hasattr(self, 'exclusiveMinimum') and lowest <= self.exclusiveMinimum:
+            return False
+
+        if hasattr(self, 'maximum') and highest > self.maximum:
+            return False
+
+        if hasattr(self, 'exclusiveMaximum') and highest >= self.exclusiveMaximum:
+            return False
+
+        return True
+
+    def check_minimum(self, data):
+        if data < self.minimum:
+            return 'This value must not be less than %s' % self.minimum
+
+    def check_maximum(self, data):
+        if data > self.maximum:
+            return 'This value must not be greater than %s' % self.maximum
+
+    def check_exclusiveMinimum(self, data):
+        if data <= self.exclusiveMinimum:
+            return 'This value must be greater than %s' % self.exclusiveMinimum
+
+    def check_exclusiveMaximum(self, data):
+        if data >= self.exclusiveMaximum:
+            return 'This value must be less than %s' % self.exclusiveMaximum
+
+    def check_multipleOf_int(self, data):
+        # for integer multipleOf, an integer modulo is enough
+        if isinstance(data, int):
+            remainder = data % self.multipleOf
+        elif data.is_integer():
+            remainder = int(data) % self.multipleOf
+        else:
+            remainder = True
+
+        if remainder:
+            return 'This value must be a multiple of %s' % self.multipleOf
+
+    def check_multipleOf(self, data):
+        # data is a multiple if data / multipleOf, i.e.
+        # (numerator * multiple_denominator) / (denominator * multiple_numerator),
+        # is a whole number
+        multiple_numerator, multiple_denominator = self.multiple_of_ratio
+
+        try:
+            numerator, denominator = get_decimal_ratio(data)
+        except (ValueError, OverflowError):
+            # nan or infinity
+            remainder = True
+        else:
+            remainder = (numerator * multiple_denominator) % (denominator * multiple_numerator)
+
+        if remainder:
+            return 'This value must be a multiple of %s' % self.multipleOf
+
+
+class IntegerNode(NumberNode):
+    def check(self, data):
+        if data is None:
+            # if not required, integer can be None (or null)
+            return ['This field is required.'] if self.required else None
+
+        # 1.0 and 1 must be treated equal
+        if isinstance(data, float) and not data.is_integer():
+            return ['Invalid value. Only integers allowed.']
+
+        # must not be boolean
+        if isinstance(data, bool):
+            return ['Invalid value. Only integers allowed.']
+
+        return super().check(data)
+
+    # floats are checked one by one because they must be whole numbers
+    batch_types = frozenset([int])
+
+
+class ConstNode(LeafNode):
+    def __init__(self, schema, required=False):
+        super().__init__(schema, required)
+        self.const = schema['const']
+
+    def check(self, data):
+        if data != self.const:
+            return ['Constant values cannot be changed']
+        return None
+
+
+class ArrayNode(ContainerNode):
+    type_error_message = _(
+        'Data structure does not match schema. '
+        'Expected an array (list) but got %(schema_type)s instead.'
+    )
+
+    def __init__(self, schema, required=False):
+        super().__init__(schema, required)
+        min_items = schema.get('minItems', schema.get('min_items', None))
+        max_items = schema.get('maxItems', schema.get('max_items', None))
+        self.min_items = int(min_items) if min_items else None
+        self.max_items = int(max_items) if max_items else None
+        self.unique_items = bool(schema.get('uniqueItems'))
+        self.choices = get_choices(schema.get('items', {}))
+
+    def link(self, compiler, schema):
+        self.items = compiler.compile_subschema(schema.get('items', {}), for_array_items=True)
+
+    def validate_node(self, data, coords, context):
+        if not isinstance(data, list):
+            raise type_mismatch_error(self.type_error_message, data)
+
+        context.enter(data)
+
+        if self.min_items and len(data) < self.min_items:
+            context.add_error(coords, 'Minimum %s items required.' % self.min_items)
+
+        if self.max_items and len(data) > self.max_items:
+            context.add_error(coords, 'Maximum %s items allowed.' % self.max_items)
+
+        if self.unique_items:
+            duplicates = self.find_duplicates(data)
+            if duplicates:
+                context.add_error(coords, 'All items in this list must be unique.')
+                for index, first_index in duplicates:
+                    context.add_error(
+                        Coords(coords, index),
+                        'This item is a duplicate of item %s.' % (first_index + 1)
+                    )
+
+        if self.choices is not None:
+            for item in data:
+                if item not in self.choices:
+                    context.add_error(coords, 'Invalid choice %s' % item)
+                    break
+
+        items = self.items
+        if not items.is_valid_batch(data):
+            check_time = context.deadline is not None
+            for index, item in enumerate(data):
+                if check_time and not index % TIME_CHECK_INTERVAL:
+                    context.check_time()
+                yield items, item, Coords(coords, index)
+
+        context.leave()
+
+    def is_valid(self, data):
+        if not isinstance(data, list):
+            return False
+
+        if self.min_items and len(data) < self.min_items:
+            return False
+
+        if self.max_items and len(data) > self.max_items:
+            return False
+
+        if self.unique_items and self.find_duplicates(data):
+            return False
+
+        if self.choices is not None:
+            for item in data:
+                if item not in self.choices:
+                    return False
+
+        if self.items.is_valid_batch(data):
+            return True
+
+        is_valid = self.items.is_valid
+        for item in data:
+            if not is_valid(item):
+                return False
+
+        return True
+
+    @staticmethod
+    def find_duplicates(data):
+        try:
+            if len(data) == len(set(data)):
+                return None
+        except TypeError:
+            # TypeError is raised when trying to make a set from unashable
+            # types i.e. lists and dicts
+            pass
+
+        # either there are duplicates or the items aren't hashable;
+        # compare the items structurally (this also finds out which
+        # items are duplicates)
+        return find_duplicates(data)
+
+
+class ObjectNode(ContainerNode):
+    type_error_message = _(
+        'Data structure does not match schema. '
+        'Expected an object (dict) but got %(schema_type)s instead.'
+    )
+
+    missing_keys_message = _('These fields are missing from the data: %(fields)s')
+
+    def __init__(self, schema, required=False, ignore_additional=False):
+        super().__init__(schema, required)
+        self.ignore_additional = ignore_additional
+
+    def link(self, compiler, schema):
+        schema_keys = schema.get('properties', schema.get('keys')) or {}
+
+        required = schema.get('required', None)
+        self.required_keys = frozenset(required if isinstance(required, list) else ())
+
+        self.properties = {
+            key: compiler.compile_subschema(schema_keys[key], required=key in self.required_keys)
+            for key in schema_keys
+        }
+
+        additional = schema.get('additionalProperties', None)
+
+        if self.ignore_additional or 'oneOf' in schema or 'anyOf' in schema or 'allOf' in schema:
+            # it's hard to determine whether a key is additional
+            # or part of oneOf/anyOf/allOf
+            # so we just skip validating it
+            additional = None
+        elif additional is True:
+            additional = {'type': 'string'}
+
+        if isinstance(additional, dict):
+            self.additional = compiler.compile_subschema(additional)
+            if self.required_keys - self.properties.keys():
+                self.additional_required = compiler.compile_subschema(additional, required=True)
+            else:
+                self.additional_required = self.additional
+        else:
+            self.additional = None
+
+        pattern_properties = schema.get('patternProperties', None)
+        if isinstance(pattern_properties, dict):
+            self.pattern_properties = tuple(
+                (compile_pattern(pattern), compiler.compile_subschema(subschema))
+                for pattern, subschema in pattern_properties.items()
+            )
+        else:
+            self.pattern_properties = ()
+
+        self.combinators = []
+        for keyword, node_class in (('oneOf', OneOfNode), ('anyOf', AnyOfNode), ('allOf', AllOfNode)):
+            if isinstance(schema.get(keyword, None), list):
+                self.combinators.append(compiler.build(node_class, schema))
+
+    def validate_node(self, data, coords, context):
+        if not isinstance(data, dict):
+            raise type_mismatch_error(self.type_error_message, data)
+
+        if not self.properties.keys() <= data.keys():
+            # schema keys must be a subset of data keys
+            # i.e. data must have all the keys present in schema
+            #
+            # We don't care if data has extra keys which are not in the
+            # schema because we can't know if the user / programmer might have
+            # manually injected those keys in the database
+            # so we only validate the keys present in the schema
+            raise JSONSchemaValidationError(
+                self.missing_keys_message,
+                params={'fields': ', '.join(self.properties.keys() - data.keys())}
+            )
+
+        context.enter(data)
+
+        properties = self.properties
+        check_time = context.deadline is not None
+
+        for index, key in enumerate(data):
+            if check_time and not index % TIME_CHECK_INTERVAL:
+                context.check_time()
+
+            if self.pattern_properties:
+                for node in self.get_key_nodes(key):
+                    yield node, data[key], Coords(coords, key)
+                continue
+
+            if key in properties:
+                node = properties[key]
+            elif self.additional is None:
+                continue
+            elif key in self.required_keys:
+                node = self.additional_required
+            else:
+                node = self.additional
+
+            yield node, data[key], Coords(coords, key)
+
+        # oneOf, anyOf, allOf (object level)
+        for node in self.combinators:
+            yield node, data, coords
+
+        context.leave()
+
+    def is_valid(self, data):
+        if not isinstance(data, dict):
+            return False
+
+        if not self.properties.keys() <= data.keys():
+            return False
+
+        properties = self.properties
+
+        for key in data:
+            if self.pattern_properties:
+                for node in self.get_key_nodes(key):
+                    if not node.is_valid(data[key]):
+                        return False
+                continue
+
+            if key in properties:
+                node = properties[key]
+            elif self.additional is None:
+                continue
+            elif key in self.required_keys:
+                node = self.additional_required
+            else:
+                node = self.additional
+
+            if not node.is_valid(data[key]):
+                return False
+
+        for node in self.combinators:
+            if not node.is_valid(data):
+                return False
+
+        return True
+
+    def get_key_nodes(self, key):
+        """Returns the nodes which the value of the given key must match
+        when the schema has patternProperties.
+
+        A key must match its property and all the matching patterns.
+        additionalProperties only applies to keys which match neither.
+        """
+        nodes = [self.properties[key]] if key in self.properties else []
+
+        for regex, node in self.pattern_properties:
+            if regex.search(str(key)):
+                nodes.append(node)
+
+        if not nodes and self.additional is not None:
+            if key in self.required_keys:
+                nodes.append(self.additional_required)
+            else:
+                nodes.append(self.additional)
+
+        return nodes
+
+
+class UnionNode(Node):
+    """Base class for oneOf and anyOf nodes.
+
+    The data is valid if it matches one of the subschemas.
+
+    If the subschemas are objects told apart by the value of a property
+    (the discriminator), the matching subschema is looked up by that
+    value instead of trying every subschema. The discriminator is either
+    given using the OpenAPI style ``discriminator`` keyword or detected
+    from a property which has a distinct ``const`` in every subschema.
+    """
+    keyword = None
+
+    def link(self, compiler, schema):
+        self.branches = [
+            compiler.compile_subschema(subschema, for_branch=True)
+            for subschema in schema[self.keyword]
+        ]
+
+        self.discriminator, self.mapping = self.get_discriminator(compiler, schema)
+
+    def get_discriminator(self, compiler, schema):
+        """Returns the discriminator property name and a dict mapping its
+        values to the branches. Returns (None, None) if the branches
+        can't be told apart by a property.
+        """
+        discriminator = schema.get('discriminator', None)
+
+        if isinstance(discriminator, dict) and isinstance(discriminator.get('propertyName'), str):
+            name = discriminator['propertyName']
+            mapping = discriminator.get('mapping', None)
+
+            if isinstance(mapping, dict):
+                return name, {
+                    value: compiler.compile_subschema({'$ref': ref}, for_branch=True)
+                    for value, ref in mapping.items()
+                }
+
+            mapping = self.get_const_mapping(name)
+            if mapping is not None:
+                return name, mapping
+
+            return None, None
+
+        # try to find a property with a const value in all branches
+        for branch in self.branches:
+            if not isinstance(branch, ObjectNode) or not hasattr(branch, 'properties'):
+                # branch isn't an object or (in recursive schemas)
+                # it's still being compiled
+                return None, None
+
+        if not self.branches:
+            return None, None
+
+        for name in self.branches[0].properties:
+            mapping = self.get_const_mapping(name)
+            if mapping is not None:
+                return name, mapping
+
+        return None, None
+
+    def get_const_mapping(self, name):
+        """Maps the const values of the given property to the branches.
+
+        Returns None if a branch doesn't have a const for the property
+        or if the values aren't unique.
+        """
+        mapping = {}
+
+        for branch in self.branches:
+            node = getattr(branch, 'properties', {}).get(name, None)
+
+            if not isinstance(node, ConstNode):
+                return None
+
+            try:
+                if node.const in mapping:
+                    return None
+            except TypeError:
+                # unhashable const
+                return None
+
+            mapping[node.const] = branch
+
+        return mapping
+
+    def get_branches(self, data):
+        """Returns the branches which the data could match."""
+        if self.discriminator is None:
+            return self.branches
+
+        if not isinstance(data, dict) or self.discriminator not in data:
+            # wouldn't match any of the object branches
+            return ()
+
+        try:
+            branch = self.mapping.get(data[self.discriminator], None)
+        except TypeError:
+            # unhashable value can't be equal to a const
+            branch = None
+
+        return (branch,) if branch is not None else ()
+
+    def validate(self, data, coords, context):
+        branches = self.get_branches(data)
+
+        if len(branches) == 1:
+            # the only candidate (e.g. picked by the discriminator)
+            # reports its own errors
+            branches[0].validate(data, coords, context)
+            return
+
+        for branch in branches:
+            if isinstance(branch, UnsupportedNode):
+                branch.validate(data, coords, context)
+
+            if self.try_branch(branch, data, coords, context):
+                return
+
+        context.add_error(coords, gettext('Some required fields are missing'))
+
+    def validate_node(self, data, coords, context):
+        branches = self.get_branches(data)
+
+        if len(branches) == 1:
+            return ((branches[0], data, coords),)
+
+        # the branches are tried by the iterative engine
+        return BranchTrial(branches, data, coords, context)
+
+    def try_branch(self, branch, data, coords, context):
+        """Returns whether the data matches the branch.
+
+        ``is_valid`` doesn't know about the resource limits, so if the
+        context has any, the branch is validated with a trial context
+        instead. Going over a limit in a branch fails the whole data.
+        """
+        if not context.has_limits():
+            return branch.is_valid(data)
+
+        trial = context.trial()
+        try:
+            branch.validate(data, coords, trial)
+        except StopValidation:
+            return False
+        except JSONSchemaValidationError as error:
+            if error.code == LIMIT_EXCEEDED:
+                raise
+            return False
+        finally:
+            context.node_count = trial.node_count
+
+        return not trial.error_count
+
+    def is_valid(self, data):
+        for branch in self.get_branches(data):
+            if branch.is_valid(data):
+                return True
+        return False
+
+
+class BranchTrial:
+    """Tries the branches of a oneOf/anyOf node one by one in the
+    iterative engine (see ``validate_iterative``).
+
+    Every branch is validated with a trial context (see
+    ``ValidationContext.trial``) until one of them has no errors.
+    """
+    def __init__(self, branches, data, coords, context):
+        self.branches = iter(branches)
+        self.data = data
+        self.coords = coords
+        self.context = context
+
+    def next_branch(self):
+        """Returns the next branch to try and its trial context.
+
+        If there are no branches left, adds the error to the context
+        and returns None.
+        """
+        for branch in self.branches:
+            if isinstance(branch, UnsupportedNode):
+                branch.validate(self.data, self.coords, self.context)
+            return branch, self.context.trial()
+
+        self.context.add_error(self.coords, gettext('Some required fields are missing'))
+        return None
+
+
+class OneOfNode(UnionNode):
+    # TODO: validate that one and only one subschema matches
+    # currently it's a bit hard to do, so we'll just match
+    # one item and don't care wheter more than one match
+    # exists or not
+    keyword = 'oneOf'
+
+
+class AnyOfNode(UnionNode):
+    keyword = 'anyOf'
+
+
+class AllOfNode(Node):
+    """All the object subschemas are combined into a single object node.
+
+    Validation of arrays is not supported for allOf and is skipped.
+    """
+    def link(self, compiler, schema):
+        combined_schema = {'type': 'object', 'properties': {}} # combine all subschemas
+        for subschema in schema['allOf']:
+            subschema = compiler.resolve(subschema)
+
+            if (get_schema_type(subschema) != 'object'):
+                continue
+
+            subschema_keys = subschema.get('properties', subschema.get('keys')) or {}
+            combined_schema['properties'].update(subschema_keys)
+
+        self.node = compiler.build(ObjectNode, combined_schema)
+
+    def validate(self, data, coords, context):
+        if isinstance(data, list):
+            return
+
+        self.node.validate(data, coords, context)
+
+    def validate_node(self, data, coords, context):
+        if isinstance(data, list):
+            return ()
+
+        return ((self.node, data, coords),)
+
+    def validate_changes(self, data, initial, coords, context):
+        if isinstance(data, list):
+            return
+
+        self.node.validate_changes(data, initial, coords, context)
+
+    def is_valid(self, data):
+        return isinstance(data, list) or self.node.is_valid(data)
+
+
+class UnsupportedNode(Node):
+    """Placeholder for subschemas whose type isn't supported.
+
+    The error is only raised if there's data to validate against it.
+    """
+    def __init__(self, message, schema_type):
+        self.message = message
+        self.schema_type = schema_type
+
+    def validate(self, data, coords, context):
+        raise JSONSchemaValidationError(self.message, params={'schema_type': self.schema_type})
+
+    def is_valid(self, data):
+        return False
+
+
+class SchemaCompiler:
+    """Compiles a schema into a tree of nodes.
+
+    Nodes for referenced subschemas are compiled only once and shared
+    by all the places referring to them. That's also what makes
+    recursive schemas possible.
+
+    The schema is treated as read-only. Nodes may keep references to
+    values from it, so it should be a private copy (see ``compile_schema``).
+    """
+    node_classes = {
+        'array': ArrayNode,
+        'object': ObjectNode,
+        'string': StringNode,
+        'boolean': BooleanNode,
+        'integer': IntegerNode,
+        'number': NumberNode,
+        'const': ConstNode,
+    }
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.refs = {}
+        self.ref_nodes = {}
+
+    def compile(self):
+        """Returns the root node for the schema."""
+        self.index_refs()
+
+        schema_type = get_schema_type(self.schema)
+
+        if schema_type in ('array', 'object'):
+            node_class = self.node_classes[schema_type]
+        elif 'allOf' in self.schema:
+            node_class = AllOfNode
+        elif 'oneOf' in self.schema:
+            node_class = OneOfNode
+        elif 'anyOf' in self.schema:
+            node_class = AnyOfNode
+        else:
+            raise JSONSchemaValidationError(
+                gettext('Outermost schema type must be either "array" (list) '
+                    'or "object" (dict)'
+                )
+            )
+
+        return self.build(node_class, self.schema)
+
+    def build(self, node_class, schema, **kwargs):
+        node = self.create_node(node_class, schema, **kwargs)
+        node.link(self, schema)
+        return node
+
+    def create_node(self, node_class, schema, **kwargs):
+        """Returns a new, unlinked node. Subclasses can override this
+        to customize the nodes (see the profiling module).
+        """
+        return node_class(schema, **kwargs)
+
+    # keywords whose values are data, not subschemas
+    # (no need to look for $refs inside them)
+    data_keywords = ('const', 'enum', 'choices', 'default', 'examples')
+
+    def index_refs(self):
+        """Resolves every $ref in the schema once and keeps the
+        targets in ``self.refs``.
+
+        This also makes sure that invalid references are reported
+        when the schema is compiled.
+        """
+        stack = [self.schema]
+
+        while stack:
+            item = stack.pop()
+
+            if isinstance(item, dict):
+                ref = item.get('$ref', None)
+                if isinstance(ref, str) and ref not in self.refs:
+                    self.refs[ref] = self.lookup_ref(ref)
+                stack.extend(
+                    value for key, value in item.items()
+                    if key not in self.data_keywords
+                )
+            elif isinstance(item, list):
+                stack.extend(item)
+
+    def lookup_ref(self, ref):
+        """Returns the subschema which the given $ref points to.
+
+        If the subschema is itself a $ref, it is followed as well.
+        """
+        seen = []
+
+        while True:
+            if ref in seen:
+                raise JSONSchemaValidationError(
+                    _('Circular $ref "%(ref)s" in the schema.'),
+                    params={'ref': ref}
+                )
+            seen.append(ref)
+
+            ref_schema = self.schema
+            for token in get_ref_tokens(ref):
+                try:
+                    if isinstance(ref_schema, list):
+                        ref_schema = ref_schema[int(token)]
+                    else:
+                        ref_schema = ref_schema[token]
+                except (KeyError, IndexError, ValueError, TypeError):
+                    ref_schema = None
+                    break
+
+            if not isinstance(ref_schema, dict):
+                raise JSONSchemaValidationError(
+                    _('Unable to resolve $ref "%(ref)s". It must point to a subschema.'),
+                    params={'ref': seen[0]}
+                )
+
+            if not isinstance(ref_schema.get('$ref', None), str):
+                return ref_schema
+
+            ref = ref_schema['$ref']
+
+    def get_ref(self, ref):
+        if ref not in self.refs:
+            self.refs[ref] = self.lookup_ref(ref)
+        return self.refs[ref]
+
+    def resolve(self, schema):
+        """Returns the referenced schema if the given schema is a $ref."""
+        if '$ref' in schema:
+            return self.get_ref(schema['$ref'])
+        return schema
+
+    def compile_subschema(self, schema, required=False, for_array_items=False, for_branch=False):
+        """Returns the node for a nested schema.
+
+        ``required`` tells whether the parent object lists this
+        subschema's key as required.
+
+        ``for_branch`` must be True for the subschemas of oneOf/anyOf.
+        Their ``additionalProperties`` keyword is ignored because it's hard
+        to tell if a property is additional or part of the parent.
+        """
+        kwargs = {'required': required}
+        if for_branch:
+            kwargs['ignore_additional'] = True
+
+        if '$ref' in schema:
+            ref_schema = self.get_ref(schema['$ref'])
+            # different $refs may point to the same subschema
+            key = (id(ref_schema), required, for_array_items, for_branch)
+            if key not in self.ref_nodes:
+                # register the node before linking it to support recursion
+                node = self.make_node(ref_schema, for_array_items, for_branch, kwargs)
+                self.ref_nodes[key] = node
+                node.link(self, ref_schema)
+            return self.ref_nodes[key]
+
+        node = self.make_node(schema, for_array_items, for_branch, kwargs)
+        node.link(self, schema)
+        return node
+
+    def make_node(self, schema, for_array_items, for_branch, kwargs):
+        next_type = get_schema_type(schema)
+        node_class = self.node_classes.get(next_type)
+
+        if node_class is None and not for_branch:
+            # property type isn't provided
+            # check for oneOf/anyOf keywords
+            if isinstance(schema.get('oneOf', None), list):
+                node_class = OneOfNode
+            elif isinstance(schema.get('anyOf', None), list):
+                node_class = AnyOfNode
+
+        if node_class is None:
+            if for_array_items:
+                message = _('Unsupported type "%(schema_type)s" for array items.')
+            else:
+                message = _('Unsupported type "%(schema_type)s" for object properties (keys).')
+            return UnsupportedNode(message, next_type)
+
+        if node_class is not ObjectNode:
+            kwargs.pop('ignore_additional', None)
+
+        return self.create_node(node_class, schema, **kwargs)
+
+
+def validate_iterative(node, data, context, coords=None):
+    """Validates the data using an explicit stack instead of recursion.
+
+    It gives the same results as ``node.validate(data, coords, context)``,
+    but the depth of the data isn't limited by the recursion limit.
+    """
+    # a frame is (children, context, trial); trial is the BranchTrial
+    # for the frames which try a branch of oneOf/anyOf
+    stack = [(iter(((node, data, coords),)), context, None)]
+    failed = None
+
+    def try_next_branch(trial):
+        branch = trial.next_branch()
+        if branch is not None:
+            branch, trial_context = branch
+            stack.append((iter(((branch, trial.data, trial.coords),)), trial_context, trial))
+
+    while stack:
+        try:
+            if failed is not None:
+                trial, failed = failed, None
+                try_next_branch(trial)
+                continue
+
+            children, frame_context, trial = stack[-1]
+
+            for node, value, coords in children:
+                children = node.validate_node(value, coords, frame_context)
+                if isinstance(children, BranchTrial):
+                    try_next_branch(children)
+                elif children:
+                    stack.append((iter(children), frame_context, None))
+                break
+            else:
+                stack.pop()
+                if trial is not None:
+                    trial.context.node_count = frame_context.node_count
+                    if frame_context.error_count:
+                        try_next_branch(trial)
+        except (StopValidation, JSONSchemaValidationError) as error:
+            if isinstance(error, JSONSchemaValidationError) and error.code == LIMIT_EXCEEDED:
+                raise
+
+            # the error fails the innermost branch being tried
+            node_count = stack[-1][1].node_count
+            while stack and stack[-1][2] is None:
+                stack.pop()
+
+            if not stack:
+                raise
+
+            failed = stack.pop()[2]
+            failed.context.node_count = node_count
+
+
+def compile_schema(schema):
+    """Compiles the given schema and returns its root node.
+
+    The nodes are built from a normalized copy of the schema, so they
+    neither modify the given schema nor see later changes made to it.
+    """
+    return SchemaCompiler(normalize_schema(schema)).compile()
+
+
+_schema_cache = None
+_schema_cache_lock = threading.Lock()
+
+
+def get_schema_cache():
+    """Returns the process-wide cache of compiled schemas.
+
+    The cache is created on first use with the size from the
+    ``VALIDATOR_CACHE_SIZE`` setting.
+    """
+    global _schema_cache
+
+    if _schema_cache is None:
+        with _schema_cache_lock:
+            if _schema_cache is None:
+                _schema_cache = LRUCache(get_setting('VALIDATOR_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+
+    return _schema_cache
+
+
+def get_compiled_schema(schema):
+    """Returns the root node for the given schema.
+
+    Compiled schemas are cached by their fingerprint so that equal
+    schemas are compiled only once per process, no matter how many
+    validators (or forms) use them.
+
+    If a module generated by the jsonform_compile command exists for
+    the schema (see PRECOMPILED_VALIDATORS setting), it's used instead
+    of compiling the schema.
+    """
+    cache = get_schema_cache()
+    # the normalized copy is used for both the fingerprint and the
+    # compilation, so the cached nodes don't share anything with
+    # the caller's schema
+    schema = normalize_schema(schema)
+    fingerprint = get_schema_fingerprint(schema)
+
+    node = cache.get(fingerprint)
+
+    if node is None:
+        # imported here because the generated modules depend on this module
+        from django_jsonform.codegen import load_precompiled_schema
+
+        node = load_precompiled_schema(fingerprint)
+        if node is None:
+            node = SchemaCompiler(schema).compile()
+        cache.set(fingerprint, node)
+
+    return node
+
+
+@receiver(setting_changed)
+def reset_schema_cache(*, setting, **kwargs):
+    global _schema_cache
+
+    if setting == 'DJANGO_JSONFORM':
+        _schema_cache = None
@@ -2,9 +2,12 @@ import json
 import django
 from django.db import models
 from django.conf import settings
-from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ValidationError
 from django.core.serializers.json import DjangoJSONEncoder
-from django_jsonform.utils import _get_django_version
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import lazy
+from django_jsonform.utils import _get_django_version, get_content_hash, get_schema_fingerprint
 
 django_major, django_minor = _get_django_version()
 
@@ -34,10 +37,19 @@ from django_jsonform.exceptions import JSONSchemaValidationError
 class JSONFormField(DjangoJSONFormField):
     def __init__(
         self, *, schema=None, encoder=None, decoder=None, model_name='',
-        file_handler='',
+        file_handler='', max_errors=None, fail_fast=False,
+        incremental_validation=False, trust_initial=False,
         **kwargs
     ):
         self.file_handler = file_handler
+        self.max_errors = max_errors
+        self.fail_fast = fail_fast
+        self.incremental_validation = incremental_validation
+        self.trust_initial = trust_initial
+        self.bound_field = None
+        # the copies of this field made for each form instance share
+        # this dict, so they also share the validator (see get_validator)
+        self.validator_cache = {}
         if not kwargs.get('widget'):
             kwargs['widget'] = JSONFormWidget(schema=schema, model_name=model_name, file_handler=file_handler)
 
@@ -45,15 +57,200 @@ class JSONFormField(DjangoJSONFormField):
 
         super().__init__(**kwargs)
 
+    def get_validator(self):
+        """Returns the validator for the widget's schema.
+
+        The validator (which compiles the schema only once) is reused by
+        all the forms using this field, unless the schema is a callable,
+        which may return a different schema every time.
+        """
+        schema = self.widget.schema
+
+        if callable(schema):
+            return self.make_validator(self.widget.get_schema())
+
+        validator = self.validator_cache.get('validator')
+        if (
+            validator is None
+            or validator.schema is not schema
+            or validator.max_errors != self.max_errors
+            or validator.fail_fast != self.fail_fast
+        ):
+            validator = self.make_validator(schema)
+            self.validator_cache['validator'] = validator
+
+        return validator
+
+    def make_validator(self, schema):
+        return JSONSchemaValidator(
+            schema=schema,
+            max_errors=self.max_errors,
+            fail_fast=self.fail_fast
+        )
+
     def validate(self, value):
         super().validate(value)
-        validator = JSONSchemaValidator(schema=self.widget.get_schema())
+
+        if self.is_trusted_initial(value):
+            return
+
         try:
-            validator(value)
+            self.get_validator().validate(value, initial=self.get_validation_initial())
         except JSONSchemaValidationError as e:
             self.add_error(e.error_map)
             raise
 
+    async def aclean(self, value):
+        """Async version of ``clean``.
+
+        Large data is validated against the schema in an executor (see
+        ``JSONSchemaValidator.avalidate``) without blocking the event loop.
+        """
+        value = self.to_python(value)
+        super().validate(value)
+
+        if not self.is_trusted_initial(value):
+            try:
+                await self.get_validator().avalidate(value, initial=self.get_validation_initial())
+            except JSONSchemaValidationError as e:
+                self.add_error(e.error_map)
+                raise
+
+        self.run_validators(value)
+        return value
+
+    def get_bound_field(self, form, field_name):
+        bound_field = super().get_bound_field(form, field_name)
+        # the form's fields are copies made for each form instance,
+        # so this doesn't leak between forms
+        self.bound_field = bound_field
+
+        if self.trust_initial:
+            # computed only when the widget is rendered
+            self.widget.initial_hash = lazy(self.get_initial_hash, str)()
+
+        return bound_field
+
+    def get_bound_initial(self):
+        """Returns the bound form's initial value for this field if it's
+        an array or an object. Otherwise, returns None.
+        """
+        if self.bound_field is None:
+            return None
+
+        initial = self.bound_field.initial
+
+        if isinstance(initial, str):
+            # initial can be a JSON string, e.g. from form's initial dict
+            try:
+                initial = json.loads(initial, cls=self.decoder)
+            except (TypeError, ValueError):
+                return None
+
+        if not isinstance(initial, (dict, list)):
+            return None
+
+        return initial
+
+    def get_validation_initial(self):
+        """Returns the initial value to compare the submitted data against
+        if incremental validation is enabled. Otherwise, returns None
+        and the data is validated fully.
+
+        Only the value saved in the database (on the model instance of a
+        ModelForm) is used. The form's initial values can come from the
+        request (e.g. the query string in the admin), so they can't be
+        assumed to be valid.
+        """
+        if not self.incremental_validation or self.bound_field is None:
+            return None
+
+        instance = getattr(self.bound_field.form, 'instance', None)
+        if not isinstance(instance, models.Model) or instance._state.adding:
+            # not loaded from the database
+            return None
+
+        try:
+            model_field = instance._meta.get_field(self.bound_field.name)
+        except FieldDoesNotExist:
+            return None
+
+        initial = model_field.value_from_object(instance)
+
+        if not isinstance(initial, (dict, list)):
+            return None
+
+        return initial
+
+    def get_instance_key(self):
+        """Returns a string identifying the model instance which is edited
+        using this field, or an empty string if there's none.
+        """
+        instance = getattr(self.widget, 'instance', None)
+
+        if instance is None and self.bound_field is not None and django.VERSION >= (4, 0):
+            # before Django 4.0, the bound field isn't available while
+            # the form is cleaned, so the hash can't depend on it
+            instance = getattr(self.bound_field.form, 'instance', None)
+
+        if instance is None:
+            return ''
+
+        return '%s.%s:%s' % (
+            type(instance).__module__, type(instance).__qualname__, getattr(instance, 'pk', '')
+        )
+
+    def get_hash_signer(self, html_name):
+        # the schema is a part of the salt so that the hashes signed
+        # before a schema change are no longer accepted, and the
+        # instance so that a hash can't be used for another object
+        salt = 'django_jsonform.initial_hash:%s:%s:%s' % (
+            html_name,
+            self.get_instance_key(),
+            get_schema_fingerprint(self.widget.get_schema())
+        )
+        return signing.Signer(salt=salt)
+
+    def get_initial_hash(self):
+        """Returns the signed hash of the initial value which is rendered
+        in the form along with the widget.
+
+        The initial value is only signed if it's valid, since it may
+        come from the request (e.g. the query string in the admin).
+        """
+        initial = self.get_bound_initial()
+        if initial is None:
+            return ''
+
+        try:
+            self.get_validator().validate(initial)
+        except JSONSchemaValidationError:
+            return ''
+
+        signer = self.get_hash_signer(self.bound_field.html_name)
+        return signer.sign(get_content_hash(initial, self.encoder))
+
+    def is_trusted_initial(self, value):
+        """Returns True if the value is the same as the initial value whose
+        signed hash was submitted with the form.
+
+        Such a value is not validated again.
+        """
+        if not self.trust_initial:
+            return False
+
+        # read from the submitted data by the widget
+        html_name, signed_hash = getattr(self.widget, 'submitted_hash', (None, None))
+        if not signed_hash:
+            return False
+
+        try:
+            initial_hash = self.get_hash_signer(html_name).unsign(signed_hash)
+        except signing.BadSignature:
+            return False
+
+        return constant_time_compare(initial_hash, get_content_hash(value, self.encoder))
+
     def run_validators(self, value):
         if value in self.empty_values:
             return
@@ -0,0 +1,94 @@
+import importlib
+import os
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django_jsonform.codegen import write_module
+from django_jsonform.exceptions import JSONSchemaValidationError
+from django_jsonform.models.fields import JSONField, ArrayField
+from django_jsonform.utils import get_setting
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates Python modules with precompiled validators for the '
+        'schemas of JSONField and ArrayField model fields.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'app_label', nargs='*',
+            help='Only compile the schemas of the models of these apps.'
+        )
+        parser.add_argument(
+            '--output-dir',
+            help=(
+                'Directory to write the modules to. Defaults to the directory '
+                'of the package named in the PRECOMPILED_VALIDATORS setting.'
+            )
+        )
+
+    def handle(self, *app_labels, **options):
+        directory = options['output_dir'] or self.get_package_dir()
+
+        os.makedirs(directory, exist_ok=True)
+        init_file = os.path.join(directory, '__init__.py')
+        if not os.path.exists(init_file):
+            open(init_file, 'w').close()
+
+        if app_labels:
+            try:
+                app_configs = [apps.get_app_config(label) for label in app_labels]
+            except LookupError as e:
+                raise CommandError(str(e))
+        else:
+            app_configs = apps.get_app_configs()
+
+        written = set()
+
+        for app_config in app_configs:
+            for model in app_config.get_models():
+                for field in model._meta.get_fields():
+                    if not isinstance(field, (JSONField, ArrayField)):
+                        continue
+
+                    name = '%s.%s.%s' % (app_config.label, model.__name__, field.name)
+
+                    if not isinstance(field.schema, dict):
+                        # callable schemas are dynamic
+                        # and ArrayField builds its schema from base_field
+                        self.stdout.write('Skipped %s: schema is not a dict.' % name)
+                        continue
+
+                    try:
+                        generator = write_module(field.schema, directory)
+                    except JSONSchemaValidationError as e:
+                        self.stderr.write('Skipped %s: %s' % (name, '; '.join(e.messages)))
+                        continue
+
+                    if generator.fingerprint in written:
+                        continue
+                    written.add(generator.fingerprint)
+
+                    message = 'Compiled %s -> %s' % (name, os.path.basename(generator.path))
+                    if generator.fallback_count:
+                        message += ' (%s nodes use the interpreter)' % generator.fallback_count
+                    self.stdout.write(message)
+
+        self.stdout.write(self.style.SUCCESS('Wrote %s module(s) to %s' % (len(written), directory)))
+
+    def get_package_dir(self):
+        package = get_setting('PRECOMPILED_VALIDATORS', None)
+        if not package:
+            raise CommandError(
+                'Set the PRECOMPILED_VALIDATORS setting or pass the --output-dir option.'
+            )
+
+        try:
+            module = importlib.import_module(package)
+        except ImportError:
+            raise CommandError(
+                'Package "%s" in PRECOMPILED_VALIDATORS setting could not be imported. '
+                'Create it (a directory with an __init__.py file) first.' % package
+            )
+
+        return os.path.dirname(module.__file__)
@@ -30,6 +30,10 @@ class JSONField(DjangoJSONField):
         self.schema = kwargs.pop('schema', {})
         self.pre_save_hook = kwargs.pop('pre_save_hook', None)
         self.file_handler = kwargs.pop('file_handler', '')
+        self.max_errors = kwargs.pop('max_errors', None)
+        self.fail_fast = kwargs.pop('fail_fast', False)
+        self.incremental_validation = kwargs.pop('incremental_validation', False)
+        self.trust_initial = kwargs.pop('trust_initial', False)
         super().__init__(*args, **kwargs)
 
     def formfield(self, **kwargs):
@@ -38,6 +42,10 @@ class JSONField(DjangoJSONField):
             'schema': self.schema,
             'model_name': self.model.__name__,
             'file_handler': self.file_handler,
+            'max_errors': self.max_errors,
+            'fail_fast': self.fail_fast,
+            'incremental_validation': self.incremental_validation,
+            'trust_initial': self.trust_initial,
             **kwargs
         })
 
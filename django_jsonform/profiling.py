@@ -0,0 +1,176 @@
+"""Profiling of the validation runs.
+
+The schema is compiled into a separate tree of nodes whose methods record
+how many times they're called and how long they take. The results are
+grouped by the path of the subschema in the (normalized) schema and the
+keyword which was evaluated.
+"""
+import threading
+from time import perf_counter
+from django_jsonform.compiler import (SchemaCompiler, Node, UnsupportedNode,
+    ConstNode, AllOfNode, ArrayNode, LeafNode)
+from django_jsonform.utils import normalize_schema
+
+
+def get_schema_paths(schema):
+    """Returns a dict mapping the ids of the subschemas (dicts) to their
+    JSON pointers, e.g. ``'#/properties/tags/items'``.
+
+    A subschema found at several paths gets the shortest one.
+    """
+    paths = {}
+    queue = [(schema, '#')]
+
+    for item, path in queue:
+        if isinstance(item, dict):
+            if id(item) in paths:
+                continue
+            paths[id(item)] = path
+            children = item.items()
+        elif isinstance(item, list):
+            children = enumerate(item)
+        else:
+            continue
+
+        for key, value in children:
+            if key not in SchemaCompiler.data_keywords:
+                token = str(key).replace('~', '~0').replace('/', '~1')
+                queue.append((value, '%s/%s' % (path, token)))
+
+    return paths
+
+
+def get_node_keyword(node):
+    """Returns the keyword under which the node's own validation
+    (including its children) is recorded.
+    """
+    if isinstance(node, ConstNode):
+        return 'const'
+    if isinstance(node, AllOfNode):
+        return 'allOf'
+    return getattr(node, 'keyword', 'type')
+
+
+class Profiler:
+    """Collects the counts and times recorded by the profiled nodes.
+
+    Each thread records its current run separately (see ``start`` and
+    ``stop``), so a validator can be used by multiple threads at once.
+    """
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.totals = {}
+
+    def start(self):
+        self.local.stats = {}
+
+    def stop(self):
+        """Adds the stats of the current run to the totals and returns
+        them as a dict (see ``get_profile``).
+        """
+        stats = self.local.stats
+        self.local.stats = None
+
+        with self.lock:
+            for key, (count, time) in stats.items():
+                total = self.totals.setdefault(key, [0, 0.0])
+                total[0] += count
+                total[1] += time
+
+        return self.export(stats)
+
+    def get_profile(self):
+        with self.lock:
+            return self.export(self.totals)
+
+    def reset(self):
+        with self.lock:
+            self.totals.clear()
+
+    @staticmethod
+    def export(stats):
+        profile = {}
+        for (path, keyword), (count, time) in stats.items():
+            profile.setdefault(path, {})[keyword] = {'count': count, 'time': time}
+        return profile
+
+    def wrap(self, func, path, keyword):
+        key = (path, keyword)
+        local = self.local
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                stats = getattr(local, 'stats', None)
+                if stats is not None:
+                    entry = stats.get(key)
+                    if entry is None:
+                        stats[key] = [1, elapsed]
+                    else:
+                        entry[0] += 1
+                        entry[1] += elapsed
+
+        return wrapper
+
+
+class ProfilingCompiler(SchemaCompiler):
+    """Compiles a schema into nodes which record their calls in the
+    given profiler.
+
+    The times of a node include the times of its children, just like the
+    cumulative times of Python's profilers.
+    """
+    def __init__(self, schema, profiler):
+        super().__init__(schema)
+        self.profiler = profiler
+        self.paths = get_schema_paths(schema)
+        # path of the node being linked, for the schemas which
+        # are made up by the compiler (e.g. the combined allOf object)
+        self.parent_paths = ['#']
+
+    def create_node(self, node_class, schema, **kwargs):
+        node = super().create_node(node_class, schema, **kwargs)
+
+        if isinstance(node, UnsupportedNode):
+            return node
+
+        path = self.paths.get(id(schema), self.parent_paths[-1])
+        wrap = self.profiler.wrap
+        keyword = get_node_keyword(node)
+
+        for name in ('validate', 'validate_changes', 'is_valid'):
+            setattr(node, name, wrap(getattr(node, name), path, keyword))
+
+        if type(node).is_valid_batch is not Node.is_valid_batch:
+            node.is_valid_batch = wrap(node.is_valid_batch, path, keyword)
+
+        if isinstance(node, LeafNode):
+            node.checks = tuple(
+                (check_keyword, wrap(check, path, check_keyword))
+                for check_keyword, check in node.checks
+            )
+        elif isinstance(node, ArrayNode):
+            node.find_duplicates = wrap(node.find_duplicates, path, 'uniqueItems')
+
+        link = node.link
+
+        def link_node(compiler, schema):
+            self.parent_paths.append(path)
+            try:
+                link(compiler, schema)
+            finally:
+                self.parent_paths.pop()
+
+        node.link = link_node
+        return node
+
+
+def compile_profiled_schema(schema, profiler):
+    """Compiles the schema into nodes which record their calls in the
+    profiler. The nodes are not cached or shared with other validators.
+    """
+    return ProfilingCompiler(normalize_schema(schema), profiler).compile()
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+
+# Sent after every validation run of a JSONSchemaValidator with
+# profile=True. Arguments: validator, profile (see Profiler.get_profile).
+validation_profiled = Signal()
@@ -0,0 +1,192 @@
+"""Validates JSON documents while they are being parsed.
+
+The document is read as a stream of parser events (using the optional
+``ijson`` package) and the values are validated as soon as they are
+complete, so large documents don't have to be loaded into memory before
+the validation can start.
+
+Arrays and objects are walked event by event where their keywords allow
+it. The subtrees which need to be seen as a whole (e.g. for oneOf or
+uniqueItems) are built first and then validated by their nodes. Values
+which the schema doesn't validate (e.g. extra keys of an object) are
+skipped without being built.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext
+from django_jsonform.compiler import ArrayNode, ObjectNode
+from django_jsonform.exceptions import JSONSchemaValidationError
+from django_jsonform.utils import Coords
+
+
+def get_parser():
+    try:
+        import ijson
+    except ImportError:
+        raise ImproperlyConfigured(
+            'Streaming validation requires the ijson package to be installed.'
+        )
+    return ijson
+
+
+class Frame:
+    """An array or an object which is being parsed.
+
+    ``nodes`` are validated against the whole value once it's complete.
+    The frame builds the value only if ``keep`` is True.
+    """
+    def __init__(self, nodes, coords, keep, is_array):
+        self.nodes = nodes
+        self.coords = coords
+        self.keep = keep or bool(nodes)
+        self.is_array = is_array
+        self.value = ([] if is_array else {}) if self.keep else None
+        self.key = None
+
+    def get_target(self):
+        """Returns the nodes and coords for the next value in this frame."""
+        return (), None
+
+    def add(self, value):
+        if self.keep:
+            if self.is_array:
+                self.value.append(value)
+            else:
+                self.value[self.key] = value
+
+    def finish(self, validate):
+        for node in self.nodes:
+            validate(node, self.value, self.coords)
+        return self.value
+
+
+class ArrayFrame(Frame):
+    """An array whose items are validated one by one."""
+    def __init__(self, node, coords, keep, context):
+        super().__init__((), coords, keep, True)
+        self.node = node
+        self.context = context
+        self.count = 0
+        context.enter(())
+
+    def get_target(self):
+        self.context.add_nodes(1)
+        return (self.node.items,), Coords(self.coords, self.count)
+
+    def add(self, value):
+        self.count += 1
+        super().add(value)
+
+    def finish(self, validate):
+        node = self.node
+        context = self.context
+
+        if node.min_items and self.count < node.min_items:
+            context.add_error(self.coords, 'Minimum %s items required.' % node.min_items)
+
+        if node.max_items and self.count > node.max_items:
+            context.add_error(self.coords, 'Maximum %s items allowed.' % node.max_items)
+
+        context.leave()
+        return self.value
+
+
+class ObjectFrame(Frame):
+    """An object whose values are validated key by key."""
+    def __init__(self, node, coords, keep, context):
+        super().__init__((), coords, keep, False)
+        self.node = node
+        self.context = context
+        self.seen = set()
+        context.enter(())
+
+    def get_target(self):
+        self.context.add_nodes(1)
+        if self.key in self.node.properties:
+            self.seen.add(self.key)
+        return tuple(self.node.get_key_nodes(self.key)), Coords(self.coords, self.key)
+
+    def finish(self, validate):
+        missing = self.node.properties.keys() - self.seen
+        if missing:
+            raise JSONSchemaValidationError(
+                self.node.missing_keys_message,
+                params={'fields': ', '.join(missing)}
+            )
+
+        self.context.leave()
+        return self.value
+
+
+class StreamValidator:
+    """Validates the events of a JSON parser against a compiled schema.
+
+    ``validate`` is called as ``validate(node, data, coords)`` for the
+    values which are validated as a whole. If ``keep`` is True, the
+    parsed data is built and returned by ``run``.
+    """
+    def __init__(self, node, context, validate, keep=False):
+        self.node = node
+        self.context = context
+        self.validate = validate
+        self.keep = keep
+
+    def run(self, events):
+        validate = self.validate
+        stack = []
+        result = None
+
+        for event, value in events:
+            if event == 'map_key':
+                stack[-1].key = value
+                continue
+
+            if event == 'end_array' or event == 'end_map':
+                value = stack.pop().finish(validate)
+            else:
+                if stack:
+                    nodes, coords = stack[-1].get_target()
+                    keep = stack[-1].keep
+                else:
+                    nodes, coords = (self.node,), None
+                    keep = self.keep
+
+                if event == 'start_array' or event == 'start_map':
+                    stack.append(self.make_frame(nodes, coords, keep, event == 'start_array'))
+                    continue
+
+                for node in nodes:
+                    validate(node, value, coords)
+
+            if stack:
+                stack[-1].add(value)
+            else:
+                result = value
+
+        return result
+
+    def make_frame(self, nodes, coords, keep, is_array):
+        if len(nodes) == 1:
+            node = nodes[0]
+            if is_array and type(node) is ArrayNode and not node.unique_items and node.choices is None:
+                return ArrayFrame(node, coords, keep, self.context)
+            if not is_array and type(node) is ObjectNode and not node.combinators:
+                return ObjectFrame(node, coords, keep, self.context)
+
+        return Frame(nodes, coords, keep, is_array)
+
+
+def validate_stream(node, source, context, validate, keep=False):
+    """Parses the JSON document from ``source`` (a file-like object or
+    a bytes or str value) and validates it against the compiled node.
+
+    Returns the parsed data if ``keep`` is True, otherwise None.
+    """
+    ijson = get_parser()
+
+    events = ijson.basic_parse(source, use_float=True)
+    validator = StreamValidator(node, context, validate, keep)
+
+    try:
+        return validator.run(events)
+    except ijson.JSONError:
+        raise JSONSchemaValidationError(gettext('Enter a valid JSON.'))
@@ -2,8 +2,12 @@ import django
 from django.utils.functional import Promise
 from django.conf import settings
 from django_jsonform.constants import JOIN_SYMBOL
+from collections import OrderedDict
+import hashlib
 import itertools
+import json
 import string
+import threading
 
 
 def normalize_schema(schema):
@@ -79,6 +83,89 @@ def get_schema_type(schema):
     return normalize_keyword(typ)
 
 
+def get_schema_fingerprint(schema):
+    """Returns a stable hash of the schema's contents.
+
+    Schemas which are equal produce the same fingerprint regardless of
+    the order of their keys. Lazy translations and other python objects
+    are included by their string values.
+    """
+    dump = json.dumps(schema, sort_keys=True, default=str)
+    return hashlib.sha256(dump.encode('utf-8')).hexdigest()
+
+
+def get_content_hash(value, encoder=None):
+    """Returns a stable hash of a JSON value.
+
+    Objects (dicts) which differ only in the order of their keys produce
+    the same hash.
+    """
+    dump = json.dumps(value, sort_keys=True, separators=(',', ':'), cls=encoder)
+    return hashlib.sha256(dump.encode('utf-8')).hexdigest()
+
+
+def count_values(data, limit):
+    """Counts the values in the data (the data itself, and the items of
+    its arrays and objects at every level).
+
+    Stops counting once the count goes over ``limit``, so it's cheap even
+    for very large data. The returned count is then only known to be
+    greater than the limit.
+    """
+    count = 1
+    stack = [data]
+
+    while stack:
+        value = stack.pop()
+
+        if isinstance(value, dict):
+            value = value.values()
+        elif not isinstance(value, list):
+            continue
+
+        count += len(value)
+        if count > limit:
+            break
+
+        stack.extend(value)
+
+    return count
+
+
+def freeze_value(value):
+    """Returns a hashable, canonical version of a JSON value.
+
+    Objects (dicts) are compared regardless of the order of their keys.
+    Booleans are kept apart from the numbers 1 and 0 because JSON treats
+    them as different values.
+    """
+    if isinstance(value, dict):
+        return (dict, frozenset((key, freeze_value(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(freeze_value(item) for item in value))
+    if isinstance(value, bool):
+        return (bool, value)
+    return value
+
+
+def find_duplicates(items):
+    """Returns a list of (index, first_index) pairs for the items which
+    are equal to an earlier item in the given list.
+
+    It's done in a single pass, comparing the items structurally
+    (see ``freeze_value``).
+    """
+    seen = {}
+    duplicates = []
+
+    for index, item in enumerate(items):
+        first_index = seen.setdefault(freeze_value(item), index)
+        if first_index != index:
+            duplicates.append((index, first_index))
+
+    return duplicates
+
+
 def get_setting(name, default=None):
     """Returns settings nested inside DJANGO_JSONFORM main setting variable"""
     if not hasattr(settings, 'DJANGO_JSONFORM'):
@@ -95,7 +182,40 @@ def split_coords(coords):
     return coords.split(JOIN_SYMBOL)
 
 
+class Coords:
+    """Coordinates of a value nested in the data.
+
+    Each instance only links to the coordinates of its parent and holds
+    its own key, which makes descending into the data cheap. The full
+    list of keys is only built when it's needed, e.g. when an error
+    is recorded.
+
+    The top level data has no coordinates (None).
+    """
+    __slots__ = ('parent', 'key')
+
+    def __init__(self, parent, key):
+        self.parent = parent
+        self.key = key
+
+    def to_list(self):
+        keys = []
+        coords = self
+        while coords is not None:
+            keys.append(coords.key)
+            coords = coords.parent
+        keys.reverse()
+        return keys
+
+    def __str__(self):
+        return join_coords(*self.to_list())
+
+
 class ErrorMap(dict):
+    # set to True if validation was stopped before all the errors
+    # were found (see JSONSchemaValidator's max_errors argument)
+    truncated = False
+
     def set(self, coords, msg):
         key = join_coords(*coords)
         
@@ -117,6 +237,62 @@ class ErrorMap(dict):
         self[key] = self[key] + msg
 
 
+class LRUCache:
+    """A thread-safe mapping which holds at most ``maxsize`` items.
+
+    When full, the least recently used item is evicted to make room for
+    a new one. If ``maxsize`` is 0, nothing is cached.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """Returns the cache statistics as a dict."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
 def _get_django_version():
     """Returns django version as a 2-tuple of (major, minor) segments.
 
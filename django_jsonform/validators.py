@@ -1,523 +1,359 @@
-import json
-from django.core.validators import validate_email
-from django.core.exceptions import ValidationError
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from django.utils import translation
 from django.utils.deconstruct import deconstructible
-from django.utils.translation import gettext, gettext_lazy as _
-from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext
 from django_jsonform.exceptions import JSONSchemaValidationError
-from django_jsonform.utils import normalize_keyword, join_coords, ErrorMap, get_schema_type
-from django_jsonform.constants import JOIN_SYMBOL
+from django_jsonform.compiler import (get_compiled_schema, validate_iterative,
+    ValidationContext, StopValidation)
+from django_jsonform.profiling import Profiler, compile_profiled_schema
+from django_jsonform.signals import validation_profiled
+from django_jsonform.streaming import validate_stream
+from django_jsonform.utils import get_setting, count_values
 
 
-@deconstructible
-class JSONSchemaValidator:
-    def __init__(self, schema):
-        self.schema = schema
-        self.error_map = ErrorMap()
-
-    def __call__(self, value):
-        # reset error_map so that this validator
-        # can be reused for the same schema
-        self.error_map = ErrorMap()
-
-        schema_type = get_schema_type(self.schema)
-
-        if schema_type == 'array':
-            self.validate_array(self.schema, value, '')
-        elif schema_type == 'object':
-            self.validate_object(self.schema, value, '')
-        elif 'allOf' in self.schema:
-            self.validate_allOf(self.schema, value, '')
-        elif 'oneOf' in self.schema:
-            self.validate_oneOf(self.schema, value, '')
-        elif 'anyOf' in self.schema:
-            self.validate_anyOf(self.schema, value, '')
-        else:
-            raise JSONSchemaValidationError(
-                gettext('Outermost schema type must be either "array" (list) '
-                    'or "object" (dict)'
-                )
-            )
-
-        if self.error_map:
-            raise JSONSchemaValidationError(
-                gettext('Please correct the errors below.'),
-                error_map=self.error_map
-            )
+def validate_chunk(validator, values):
+    """Returns the results of ``validator.get_error`` for the values.
 
-    def join_coords(self, *args):
-        return join_coords(*args)
+    It's a module level function so that it can be sent to the worker
+    processes of a ProcessPoolExecutor.
+    """
+    return [validator.get_error(value) for value in values]
 
-    def add_error(self, key, msg, *, raise_exc=False):
-        """Add a field's error to validator's error_map.
 
-        The error_map can be used for displaying error on the form page.
+def validate_in_language(validator, value, initial, language):
+    """Validates the value with the given language active.
 
-        If raise_exc is True, it raises JSONSchemaValidationError exception
-        instead of adding the error to error_map.
-        It is useful in cases when early exit is required from validation.
-        """
-        if raise_exc:
-            raise JSONSchemaValidationError(msg)
-        if key not in self.error_map:
-            self.error_map.set(coords=[key], msg=msg)
-        else:
-            self.error_map.append(coords=[key], msg=msg)
-
-    def get_validator(self, schema_type):
-        return getattr(self, 'validate_%s' % schema_type, None)
+    Used for the worker processes of a ProcessPoolExecutor which don't
+    share the caller's context.
+    """
+    with translation.override(language):
+        validator.validate(value, initial)
 
-    def get_ref(self, ref):
-        ref_schema = self.schema
-        tokens = ref.split('/')
 
-        for token in tokens:
-            if token == '#':
-                continue
-            else:
-                # :TODO: handle KeyError and raise a custom exception
-                ref_schema = ref_schema[token]
+@deconstructible
+class JSONSchemaValidator:
+    """Validates data against a JSON schema.
+
+    The validator doesn't keep any state between validation runs. One
+    instance can be used by multiple threads at the same time.
+
+    ``max_errors`` limits the number of reported errors (``fail_fast`` is
+    the same as ``max_errors=1``). The validation stops at the first error
+    beyond the limit and the ``truncated`` attribute of the raised
+    exception's error_map is set to True.
+
+    ``max_depth``, ``max_nodes``, ``max_string_length`` and ``time_limit``
+    limit the resources spent on validating the data. The limits which
+    aren't given are taken from the VALIDATOR_LIMITS setting.
+
+    ``engine`` selects how the data is walked: ``'recursive'`` (default)
+    or ``'iterative'``, which uses an explicit stack and isn't limited by
+    Python's recursion limit for deeply nested data.
+
+    The validator can be pickled (the compiled schema isn't included
+    and is compiled again when the validator is first used after
+    unpickling), so it can be sent to other processes.
+
+    ``profile`` records the number of evaluations and the time spent per
+    schema path and keyword (see ``get_profile``). It slows down the
+    validation, so it should only be enabled for finding slow schemas.
+    """
+    limit_names = ('max_depth', 'max_nodes', 'max_string_length', 'time_limit')
+
+    engines = ('recursive', 'iterative')
+
+    def __init__(
+        self, schema, max_errors=None, fail_fast=False, max_depth=None,
+        max_nodes=None, max_string_length=None, time_limit=None, engine=None,
+        profile=False
+    ):
+        if engine is not None and engine not in self.engines:
+            raise ValueError(
+                'Invalid engine %r. Must be one of: %s' % (engine, ', '.join(self.engines))
+            )
 
-        return ref_schema
+        self.schema = schema
+        self.engine = engine
+        self.max_errors = max_errors
+        self.fail_fast = fail_fast
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.max_string_length = max_string_length
+        self.time_limit = time_limit
+        self.profile = profile
+        self.compiled_schema = None
+        self.profiler = None
 
-    def get_date(self, value):
-        """Returns datetime.date object for the given ``value``.
-        Returns None if unable to parse.
+    def __call__(self, value):
+        self.validate(value)
 
-        The value must be in YYYY-MM-DD format.
-        """
-        try:
-            return timezone.datetime.strptime(value, '%Y-%m-%d').date()
-        except ValueError:
-            return None
+    def compile(self):
+        """Compiles the schema into a tree of validation nodes and
+        returns the root node.
 
-    def get_time(self, value):
-        """Returns datetime.time object for the given ``value``.
-        Returns None if unable to parse.
+        The schema is compiled only once, on first use. Later changes
+        to the schema dict are not seen by this validator.
 
-        The value must be in HH:MM:SS or HH:MM format.
+        Compiled schemas are shared with the other validators for equal
+        schemas through a process-wide cache.
         """
-        for format_ in ['%H:%M', '%H:%M:%S']:
-            try:
-                return timezone.datetime.strptime(value, format_).time()
-            except ValueError:
-                continue
-
-        return None
-
-    def get_datetime(self, value):
-        """Returns datetime.datetime object for the given ``value``.
-        Returns None if unable to parse.
+        if self.compiled_schema is None:
+            if self.profile:
+                # profiled nodes are private to this validator
+                self.profiler = Profiler()
+                self.compiled_schema = compile_profiled_schema(self.schema, self.profiler)
+            else:
+                self.compiled_schema = get_compiled_schema(self.schema)
+        return self.compiled_schema
 
-        The value must be in ISO format.
+    def get_limits(self):
+        """Returns the resource limits as a dict of keyword arguments
+        for the ValidationContext.
         """
-        try:
-            return timezone.datetime.fromisoformat(value)
-        except ValueError:
-            return None
-
-    def get_choice_values(self, choices):
-        """Returns values for given choices.
-
-        Useful for extracting choice values for object choices.
+        defaults = get_setting('VALIDATOR_LIMITS', {})
+        limits = {}
+
+        for name in self.limit_names:
+            value = getattr(self, name)
+            if value is None:
+                value = defaults.get(name.upper(), None)
+            limits[name] = value
+
+        return limits
+
+    def get_context(self):
+        return ValidationContext(
+            max_errors=self.max_errors,
+            fail_fast=self.fail_fast,
+            **self.get_limits()
+        )
+
+    def get_engine(self):
+        if self.profile:
+            # the iterative engine bypasses the profiled container nodes
+            return 'recursive'
+        return self.engine or get_setting('VALIDATOR_ENGINE', 'recursive')
+
+    def get_profile(self):
+        """Returns the profile recorded so far, if ``profile`` is enabled.
+
+        It's a dict mapping the paths of the subschemas (JSON pointers into
+        the normalized schema) to dicts of keywords, each having a ``count``
+        of evaluations and the total ``time`` in seconds. The time of a
+        subschema's ``type`` (or ``oneOf``, ``anyOf``, etc.) includes the
+        time spent on its children.
         """
-        values = []
-        for choice in choices:
-            if isinstance(choice, dict):
-                choice = choice.get('value', '')
-            values.append(choice)
-        return values
-
-    def is_value_in_choices(self, schema, value):
-        """Checks whether the given value is present in choices or not.
-        If the schema doesn't have choices/enum, it returns True.
+        if self.profiler is None:
+            return {}
+        return self.profiler.get_profile()
+
+    def reset_profile(self):
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    @contextmanager
+    def profile_run(self):
+        """Records the profile of a validation run and sends the
+        ``validation_profiled`` signal when it's done.
         """
-        choices = schema.get('choices', schema.get('enum', None))
+        profiler = self.profiler
 
-        if not choices:
-            return True
-
-        choices = self.get_choice_values(choices)
-
-        return value in choices
-
-
-    def validate_array(self, schema, data, coords, *, raise_exc=False):
-        if not isinstance(data, list):
-            data_type = type(data).__name__
-            data_type_norm = normalize_keyword(data_type)
-            raise JSONSchemaValidationError(
-                _(
-                    'Data structure does not match schema. '
-                    'Expected an array (list) but got %(schema_type)s instead.'
-                ),
-                params={'schema_type': '%s (%s)' % (data_type_norm, data_type) if data_type_norm else data_type}
-            )
-
-        minItems = schema.get('minItems', schema.get('min_items', None))
-        maxItems = schema.get('maxItems', schema.get('max_items', None))
-        choices = schema['items'].get('choices', schema['items'].get('enum', None))
-
-        if minItems and len(data) < int(minItems):
-            self.add_error(coords, 'Minimum %s items required.' % (minItems), raise_exc=False)
-
-        if maxItems and len(data) > int(maxItems):
-            self.add_error(coords, 'Maximum %s items allowed.' % (maxItems), raise_exc=raise_exc)
-
-        if schema.get('uniqueItems'):
-            try:
-                if len(data) != len(set(data)):
-                    self.add_error(coords, 'All items in this list must be unique.', raise_exc=raise_exc)
-            except TypeError:
-                # TypeError is raised when trying to make a set from unashable types
-                # i.e. lists and dicts
-                # so we JSON-ify each item to make it a string
-                if len(data) != len(set([json.dumps(item) for item in data])):
-                    self.add_error(coords, 'All items in this list must be unique.', raise_exc=raise_exc)
-
-        if choices:
-            choice_values = self.get_choice_values(choices)
-            for item in data:
-                if item not in choice_values:
-                    self.add_error(coords, 'Invalid choice %s' % item, raise_exc=raise_exc)
-                    break
-
-        next_schema = schema['items']
-
-        if '$ref' in next_schema:
-            next_schema = self.get_ref(next_schema['$ref'])
-
-        next_type = get_schema_type(next_schema)
-        next_validator = None
-
-        if next_type is None:
-            # property type isn't provided
-            # check for oneOf/anyOf keywords
-            if isinstance(next_schema.get('oneOf', None), list):
-                next_validator = self.validate_oneOf
-            elif isinstance(next_schema.get('anyOf', None), list):
-                next_validator = self.validate_anyOf
-        else:
-            next_validator = self.get_validator(next_type)
-
-        if next_validator:
-            for index, item in enumerate(data):
-                next_validator(next_schema, item, self.join_coords(coords, index), raise_exc=raise_exc)
-        else:
-            raise JSONSchemaValidationError(
-                _('Unsupported type "%(schema_type)s" for array items.'),
-                params={'schema_type': next_type}
-            )
-
-    def validate_object(self, schema, data, coords, raise_exc=False):
-        if not isinstance(data, dict):
-            data_type = type(data).__name__
-            data_type_norm = normalize_keyword(data_type)
-            raise JSONSchemaValidationError(
-                _(
-                    'Data structure does not match schema. '
-                    'Expected an object (dict) but got %(schema_type)s instead.'
-                ),
-                params={'schema_type': '%s (%s)' % (data_type_norm, data_type) if data_type_norm else data_type}
-            )
+        if profiler is None:
+            yield
+            return
 
-        schema_keys = schema.get('properties', schema.get('keys')) or {}
+        profiler.start()
+        try:
+            yield
+        finally:
+            profile = profiler.stop()
+            validation_profiled.send(sender=self.__class__, validator=self, profile=profile)
 
-        if not schema_keys.keys() <= data.keys():
-            # schema keys must be a subset of data keys
-            # i.e. data must have all the keys present in schema
-            #
-            # We don't care if data has extra keys which are not in the
-            # schema because we can't know if the user / programmer might have
-            # manually injected those keys in the database
-            # so we only validate the keys present in the schema
+    def raise_errors(self, context):
+        if context.error_map:
             raise JSONSchemaValidationError(
-                _('These fields are missing from the data: %(fields)s'),
-                params={'fields': ', '.join(schema_keys.keys() - data.keys())}
+                gettext('Please correct the errors below.'),
+                error_map=context.error_map
             )
 
-        for key in data:
-            if key in schema_keys:
-                next_schema = schema_keys[key]
-            else:
-                if 'additionalProperties' not in schema:
-                    continue
-
-                if 'oneOf' in schema or 'anyOf' in schema or 'allOf' in schema:
-                    # it's hard to determine whether this key is additional
-                    # or part of oneOf/anyOf/allOf
-                    # so we jus skip validating it
-                    continue
-
-                next_schema = schema['additionalProperties']
-
-                if next_schema == True:
-                    next_schema = {'type': 'string'}
-
-            if '$ref' in next_schema:
-                next_schema = self.get_ref(next_schema['$ref'])
+    def validate(self, value, initial=None):
+        """Validates the value and raises JSONSchemaValidationError if
+        it's invalid.
 
-            if isinstance(schema.get('required', None), list):
-                if key in schema['required'] and 'required' not in next_schema:
-                    next_schema['required'] = True
-
-            next_type = get_schema_type(next_schema)
-            next_validator = None
-
-            if next_type is None:
-                # property type isn't provided
-                # check for oneOf/anyOf keywords
-                if isinstance(next_schema.get('oneOf', None), list):
-                    next_validator = self.validate_oneOf
-                elif isinstance(next_schema.get('anyOf', None), list):
-                    next_validator = self.validate_anyOf
-            else:
-                next_validator = self.get_validator(next_type)
-
-            if next_validator:
-                next_validator(next_schema, data[key], self.join_coords(coords, key), raise_exc=raise_exc)
-            else:
-                raise JSONSchemaValidationError(
-                    _('Unsupported type "%(schema_type)s" for object properties (keys).'),
-                    params={'schema_type': next_type}
-                )
-
-        # oneOf (object level)
-        if isinstance(schema.get('oneOf', None), list):
-            self.validate_oneOf(schema, data, coords, raise_exc=raise_exc)
-
-        # anyOf (object level)
-        if isinstance(schema.get('anyOf', None), list):
-            self.validate_anyOf(schema, data, coords, raise_exc=raise_exc)
-
-        # allOf (object level)
-        if isinstance(schema.get('allOf', None), list):
-            self.validate_allOf(schema, data, coords, raise_exc=raise_exc)
-
-    def validate_string(self, schema, data, coords, raise_exc=False):
-        if isinstance(data, str):
-            trimmed_data = data.strip()
-        else:
-            trimmed_data = data
-
-        is_empty = not trimmed_data
-
-        if schema.get('required') and is_empty:
-            self.add_error(coords, 'This field is required.', raise_exc=raise_exc)
-            return
-
-        if not isinstance(data, str):
-            self.add_error(coords, 'This value is invalid. Must be a valid string.', raise_exc=raise_exc)
-            return
+        If ``initial`` is given, it must be a previous, valid value of
+        the data. Only the parts of the value which differ from it are
+        validated (along with the checks of the arrays and objects
+        containing them, like minItems or uniqueItems).
+        """
+        context = self.get_context()
+        engine = self.get_engine()
+        node = self.compile()
 
-        if is_empty:
-            # data not required and is empty
-            return
+        try:
+            with self.profile_run():
+                if initial is not None:
+                    node.validate_changes(value, initial, None, context)
+                elif engine == 'iterative':
+                    validate_iterative(node, value, context)
+                else:
+                    node.validate(value, None, context)
+        except StopValidation:
+            pass
+        except RecursionError:
+            raise JSONSchemaValidationError(gettext('The data is nested too deeply.')) from None
 
-        if not self.is_value_in_choices(schema, data):
-            self.add_error(coords, 'Invalid choice "%s"' % data, raise_exc=raise_exc)
-            return
+        self.raise_errors(context)
 
-        if isinstance(schema.get('minLength'), int) and len(data) < int(schema['minLength']):
-            self.add_error(coords, 'Minumum length must be %s' % schema['minLength'], raise_exc=raise_exc)
-
-        if isinstance(schema.get('maxLength'), int) and len(data) > int(schema['maxLength']):
-            self.add_error(coords, 'Maximum length must be %s' % schema['maxLength'], raise_exc=raise_exc)
-
-        format_ = normalize_keyword(schema.get('format'))
-
-        if format_:
-            if format_ == 'email':
-                try:
-                    validate_email(data)
-                except ValidationError:
-                    self.add_error(coords, 'Enter a valid email address.', raise_exc=raise_exc)
-            elif format_ == 'date':
-                if not self.get_date(data):
-                    self.add_error(coords, 'Enter a valid date.', raise_exc=raise_exc)
-            elif format_ == 'time':
-                if not self.get_time(data):
-                    self.add_error(coords, 'Enter a valid time.', raise_exc=raise_exc)
-            elif format_ == 'date-time':
-                if not self.get_datetime(data):
-                    self.add_error(coords, 'Enter a valid date and time.', raise_exc=raise_exc)
-
-    def validate_boolean(self, schema, data, coords, raise_exc=False):
-        if schema.get('required') and data is None:
-            self.add_error(coords, 'This field is required.', raise_exc=raise_exc)
-            return
+    async def avalidate(self, value, initial=None, executor=None, threshold=None):
+        """Async version of ``validate``.
 
-        if not isinstance(data, bool) and data is not None:
-            self.add_error(coords, 'Invalid value.', raise_exc=raise_exc)
+        Data with more than ``threshold`` values (default is taken from the
+        ASYNC_VALIDATION_THRESHOLD setting) is validated in an ``executor``
+        so that the event loop isn't blocked. Smaller data is validated
+        right away.
 
-    def validate_integer(self, schema, data, coords, raise_exc=False):
-        if schema.get('required') and data is None:
-            self.add_error(coords, 'This field is required.', raise_exc=raise_exc)
-            return
+        The default executor is taken from the ASYNC_VALIDATION_EXECUTOR
+        setting. If that's not set either, the event loop's default
+        executor (a thread pool) is used.
 
-        if data is None:
-            # if not required, integer can be None (or null)
-            return
+        The validation runs in the caller's context, so the active
+        language (and other context variables) is the same as in the
+        caller. Process pools only get the active language.
+        """
+        if threshold is None:
+            threshold = get_setting('ASYNC_VALIDATION_THRESHOLD', 1000)
 
-        # 1.0 and 1 must be treated equal
-        if (isinstance(data, float) and data != int(data)):
-            self.add_error(coords, 'Invalid value. Only integers allowed.', raise_exc=raise_exc)
+        if count_values(value, threshold) <= threshold:
+            self.validate(value, initial)
             return
 
-        # must not be boolean
-        if isinstance(data, bool):
-            self.add_error(coords, 'Invalid value. Only integers allowed.', raise_exc=raise_exc)
+        if executor is None:
+            executor = get_setting('ASYNC_VALIDATION_EXECUTOR', None)
+            if isinstance(executor, str):
+                executor = import_string(executor)
+
+        if isinstance(executor, ProcessPoolExecutor):
+            # contexts can't be sent to other processes
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, partial(
+                validate_in_language, self, value, initial, translation.get_language()
+            ))
             return
 
-        self.validate_number(schema, data, coords, raise_exc=raise_exc)
+        # asgiref is only installed with Django 3.0+
+        from asgiref.sync import sync_to_async
 
-    def validate_number(self, schema, data, coords, raise_exc=False):
-        if schema.get('required') and data is None:
-            self.add_error(coords, 'This field is required.', raise_exc=raise_exc)
-            return
+        kwargs = {'thread_sensitive': False}
+        if executor is not None:
+            kwargs['executor'] = executor
+        await sync_to_async(self.validate, **kwargs)(value, initial)
 
-        if data is None:
-            # if not required, number can be None (or null)
-            return
+    def validate_stream(self, source, keep=False):
+        """Parses the JSON document from ``source`` (a file-like object,
+        bytes or str) and validates it while it's being parsed.
 
-        if not isinstance(data, (float, int)) and data is not None:
-            self.add_error(coords, 'Invalid value. Only numbers allowed.', raise_exc=raise_exc)
-            return
+        Raises JSONSchemaValidationError if the document is invalid. The
+        parsing stops as soon as the validation fails (e.g. with
+        ``fail_fast``).
 
-        # must not be boolean
-        if isinstance(data, bool):
-            self.add_error(coords, 'Invalid value. Only numbers allowed.', raise_exc=raise_exc)
-            return
+        The parsed data is not kept in memory, unless ``keep`` is True.
+        Then, the data is returned if it's valid.
 
-        if not self.is_value_in_choices(schema, data):
-            self.add_error(coords, 'Invalid choice "%s"' % data, raise_exc=raise_exc)
-            return
+        Requires the ijson package.
+        """
+        context = self.get_context()
 
-        data = float(data)
+        if self.get_engine() == 'iterative':
+            def validate(node, data, coords):
+                validate_iterative(node, data, context, coords)
+        else:
+            def validate(node, data, coords):
+                node.validate(data, coords, context)
 
-        if  isinstance(schema.get('minimum'), (int, float))  and data < float(schema['minimum']):
-            self.add_error(coords, 'This value must not be less than %s' % (schema['minimum']), raise_exc=raise_exc)
+        node = self.compile()
+        data = None
 
-        if  isinstance(schema.get('maximum'), (int, float)) and data > float(schema['maximum']):
-            self.add_error(coords, 'This value must not be greater than %s' % (schema['maximum']), raise_exc=raise_exc)
+        try:
+            with self.profile_run():
+                data = validate_stream(node, source, context, validate, keep)
+        except StopValidation:
+            pass
+        except RecursionError:
+            raise JSONSchemaValidationError(gettext('The data is nested too deeply.')) from None
 
-        if  isinstance(schema.get('exclusiveMinimum'), (int, float)) and data <= float(schema['exclusiveMinimum']):
-            self.add_error(coords, 'This value must be greater than %s' % (schema['exclusiveMinimum']), raise_exc=raise_exc)
+        self.raise_errors(context)
 
-        if  isinstance(schema.get('exclusiveMaximum'), (int, float)) and data >= float(schema['exclusiveMaximum']):
-            self.add_error(coords, 'This value must be less than %s' % (schema['exclusiveMaximum']), raise_exc=raise_exc)
+        return data
 
-        if isinstance(schema.get('multipleOf'), (int, float)) and ((data * 100) % (schema['multipleOf'] * 100)) / 100:
-            self.add_error(coords, 'This value must be a multiple of %s' % (schema['multipleOf']), raise_exc=raise_exc)
+    def get_error(self, value):
+        """Validates the value and returns the JSONSchemaValidationError
+        if it's invalid. Otherwise, returns None.
+        """
+        try:
+            self.validate(value)
+        except JSONSchemaValidationError as e:
+            return e
+        return None
 
-    def validate_oneOf(self, schema, data, coords, raise_exc=False):
-        if '$ref' in schema:
-            schema = self.get_ref(schema['$ref'])
+    def validate_many(self, values, executor=None, chunk_size=100):
+        """Validates each of the values and lazily yields the results in
+        the same order: None for a valid value and a
+        JSONSchemaValidationError for an invalid one.
 
-        matches_found = 0
-        for subschema in schema['oneOf']:
-            if '$ref' in subschema:
-                subschema = self.get_ref(subschema['$ref'])
+        ``values`` can be any iterable, e.g. a generator reading the
+        documents from a file. The schema is compiled only once.
 
-            # we also ignore additionalProperties inside subschema
-            # because it's hard to tell if a property is additional
-            # or part of parent
-            subschema.pop('additionalProperties', None)
+        If an ``executor`` (e.g. a ProcessPoolExecutor) is given, the
+        values are sent to it in chunks of ``chunk_size`` values. Only a
+        few chunks are pending at a time, so the values aren't all read
+        into memory at once. Batches which fit in a single chunk are
+        validated in the current process.
+        """
+        self.compile()
 
-            next_type = get_schema_type(subschema)
-            next_validator = self.get_validator(next_type)
-            if next_validator:
-                try:
-                    next_validator(subschema, data, coords, raise_exc=True)
-                except JSONSchemaValidationError:
-                    continue
-                else:
-                    matches_found += 1
-                    # if matches_found > 1:
-                    #    break
-                    #
-                    # TODO: validate that one and only one subschema matches
-                    # currently it's a bit hard to do, so we'll just match
-                    # one item and don't care wheter more than one match
-                    # exists or not
-                    break
-            else:
-                raise JSONSchemaValidationError(
-                    _('Unsupported type "%(schema_type)s" for object properties (keys).'),
-                    params={'schema_type': next_type}
-                )
-        if matches_found > 1:
-            # NOTE: this error should be added to the error_map instead of raising exception
-            # For the time being, this will not run
-            raise JSONSchemaValidationError(_('Invalid value. More than one matches found for oneOf.'))
-        elif matches_found < 1:
-            raise JSONSchemaValidationError(_('Some required fields are missing'))
-
-    def validate_anyOf(self, schema, data, coords, raise_exc=False):
-        if '$ref' in schema:
-            schema = self.get_ref(schema['$ref'])
-
-        matches_found = 0
-        for subschema in schema['anyOf']:
-            if '$ref' in subschema:
-                subschema = self.get_ref(subschema['$ref'])
-
-            # we also ignore additionalProperties inside subschema
-            # because it's hard to tell if a property is additional
-            # or part of parent
-            subschema.pop('additionalProperties', None)
-
-            next_type = get_schema_type(subschema)
-            next_validator = self.get_validator(next_type)
-            if next_validator:
-                try:
-                    next_validator(subschema, data, coords, raise_exc=True)
-                except JSONSchemaValidationError:
-                    continue
-                else:
-                    matches_found += 1
-                    break
-            else:
-                raise JSONSchemaValidationError(
-                    _('Unsupported type "%(schema_type)s" for object properties (keys).'),
-                    params={'schema_type': next_type}
-                )
-        if not matches_found:
-            # NOTE: this error should be added to the error_map instead of raising exception
-            raise JSONSchemaValidationError(_('Some required fields are missing'))
-
-    def validate_allOf(self, schema, data, coords, raise_exc=False):
-        if isinstance(data, list):
+        if executor is None:
+            for value in values:
+                yield self.get_error(value)
             return
 
-        allOf_combined_schema = {'type': 'object', 'properties': {}} # combine all subschemas
-        for subschema in schema['allOf']:
-            if '$ref' in subschema:
-                subschema = self.get_ref(subschema['$ref'])
-
-            if (get_schema_type(subschema) != 'object'):
-                continue
+        values = iter(values)
+        chunk = list(islice(values, chunk_size))
 
-            subschema_keys = subschema.get('properties', subschema.get('keys')) or {}
-            for key in subschema_keys:
-                allOf_combined_schema['properties'][key] = subschema_keys[key]
+        if len(chunk) < chunk_size:
+            # not worth sending to the executor
+            yield from validate_chunk(self, chunk)
+            return
 
-        # all keys in allOf must be present in data
-        allOf_keys = allOf_combined_schema['properties']
+        max_pending = 2 * (os.cpu_count() or 1)
+        pending = deque()
 
-        if not allOf_keys.keys() <= data.keys():
-            raise JSONSchemaValidationError(
-                _('These fields are missing from the data: %(fields)s'),
-                params={'fields': ', '.join(allOf_keys.keys() - data.keys())}
-            )
+        while chunk or pending:
+            while chunk and len(pending) < max_pending:
+                pending.append(executor.submit(validate_chunk, self, chunk))
+                chunk = list(islice(values, chunk_size))
 
-        subdata = {key: data[key] for key in allOf_keys.keys()}
-        self.validate_object(allOf_combined_schema, subdata, coords, raise_exc=raise_exc)
+            yield from pending.popleft().result()
 
-    def validate_const(self, schema, data, coords, raise_exc=False):
-        const = schema['const']
-        if data != const:
-            self.add_error(coords, 'Constant values cannot be changed', raise_exc=raise_exc)
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # compiled nodes may hold locks and are cached per process anyway
+        state['compiled_schema'] = None
+        state['profiler'] = None
+        return state
 
     def __eq__(self, other):
-        return self.schema == other.schema
+        return (
+            self.schema == other.schema
+            and self.max_errors == other.max_errors
+            and self.fail_fast == other.fail_fast
+            and self.engine == other.engine
+            and self.profile == other.profile
+            and all(getattr(self, name) == getattr(other, name) for name in self.limit_names)
+        )
@@ -62,6 +62,7 @@ class JSONFormWidget(forms.Widget):
                 'validateOnSubmit': self.validate_on_submit,
                 'readonly': attrs.get('disabled', False),
             },
+            'initial_hash': getattr(self, 'initial_hash', ''),
         })
 
         # backwards compatibility for `JSONFORM_UPLOAD_HANDLER` setting
@@ -82,6 +83,12 @@ class JSONFormWidget(forms.Widget):
 
         return mark_safe(render_to_string(self.template_name, context))
 
+    def value_from_datadict(self, data, files, name):
+        # the signed hash of the initial value rendered with the
+        # widget (see JSONFormField.trust_initial)
+        self.submitted_hash = (name, data.get(name + '__hash'))
+        return super().value_from_datadict(data, files, name)
+
     def add_error(self, error_map):
         if not hasattr(self, 'error_map'):
             setattr(self, 'error_map', copy.deepcopy(error_map))
@@ -6,6 +6,9 @@ import django
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# the tests import their shared helpers from the tests package
+sys.path.insert(0, os.path.dirname(TEST_DIR))
+
 
 if __name__ == '__main__':
     os.environ['DJANGO_SETTINGS_MODULE'] = 'django_settings'
@@ -0,0 +1,159 @@
+import asyncio
+import re
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+import django
+from django import forms
+from django.db import models
+from django.test.utils import isolate_apps
+from django_jsonform.forms.fields import JSONFormField
+from django_jsonform.models.fields import JSONField
+from django_jsonform.validators import JSONSchemaValidator
+
+
+SCHEMA = {'type': 'array', 'items': {'type': 'string', 'maxLength': 3}}
+
+
+def get_form_class(**field_kwargs):
+    class Form(forms.Form):
+        data = JSONFormField(schema=SCHEMA, **field_kwargs)
+
+    return Form
+
+
+def get_model_class():
+    # used in the tests decorated with isolate_apps
+    class Document(models.Model):
+        data = JSONField(schema=SCHEMA, incremental_validation=True)
+
+        class Meta:
+            app_label = 'django_jsonform'
+
+    return Document
+
+
+def count_validations(form):
+    """Returns how many times the form's data is validated against the schema."""
+    with patch.object(JSONSchemaValidator, 'validate', autospec=True, side_effect=JSONSchemaValidator.validate) as validate:
+        form.is_valid()
+    return validate.call_count
+
+
+def get_initial_hash(form):
+    match = re.search(r'name="data__hash" value="([^"]+)"', str(form['data']))
+    return match.group(1) if match else None
+
+
+class JSONFormFieldTests(TestCase):
+    @skipIf(django.VERSION < (4, 0), 'the initial value is only available during cleaning since Django 4.0')
+    @isolate_apps('django_jsonform')
+    def test_incremental_validation(self):
+        Document = get_model_class()
+
+        class Form(forms.ModelForm):
+            class Meta:
+                model = Document
+                fields = ['data']
+
+        # unchanged items of the saved value are not validated
+        instance = Document.from_db('default', ['id', 'data'], [1, ['too long', 'ok']])
+        form = Form(data={'data': '["too long", "new"]'}, instance=instance)
+        self.assertTrue(form.is_valid())
+
+        form = Form(data={'data': '["too long", "too long"]'}, instance=instance)
+        self.assertFalse(form.is_valid())
+
+        # form's initial values (e.g. from the query string) are not trusted
+        form = Form(data={'data': '["too long", "new"]'}, initial={'data': ['too long', 'ok']})
+        self.assertFalse(form.is_valid())
+
+        form = get_form_class(incremental_validation=True)(
+            data={'data': '["too long", "new"]'}, initial={'data': ['too long', 'ok']}
+        )
+        self.assertFalse(form.is_valid())
+
+        # unsaved instance
+        form = Form(data={'data': '["too long", "new"]'}, instance=Document(data=['too long', 'ok']))
+        self.assertFalse(form.is_valid())
+
+    def test_trust_initial(self):
+        Form = get_form_class(trust_initial=True)
+        initial = {'data': ['ok']}
+
+        initial_hash = get_initial_hash(Form(initial=initial))
+        self.assertIsNotNone(initial_hash)
+
+        # unchanged value is trusted
+        form = Form(data={'data': '["ok"]', 'data__hash': initial_hash}, initial=initial)
+        self.assertEqual(count_validations(form), 0)
+        self.assertTrue(form.is_valid())
+
+        # changed value is validated
+        form = Form(data={'data': '["ok", "a"]', 'data__hash': initial_hash}, initial=initial)
+        self.assertEqual(count_validations(form), 1)
+
+        form = Form(data={'data': '["ok", "too long"]', 'data__hash': initial_hash}, initial=initial)
+        self.assertFalse(form.is_valid())
+
+        # missing or tampered hash
+        form = Form(data={'data': '["ok"]'}, initial=initial)
+        self.assertEqual(count_validations(form), 1)
+
+        form = Form(data={'data': '["ok"]', 'data__hash': initial_hash[:-1]}, initial=initial)
+        self.assertEqual(count_validations(form), 1)
+
+        # the hash is rendered for the initial value, not the submitted data
+        form = Form(data={'data': '["ok", "a"]', 'data__hash': initial_hash}, initial=initial)
+        self.assertEqual(get_initial_hash(form), initial_hash)
+
+    def test_invalid_initial_is_not_trusted(self):
+        Form = get_form_class(trust_initial=True)
+
+        # e.g. the initial value given in the query string of the admin
+        self.assertIsNone(get_initial_hash(Form(initial={'data': ['too long']})))
+
+        form = Form(data={'data': '["too long"]', 'data__hash': ''}, initial={'data': ['too long']})
+        self.assertFalse(form.is_valid())
+
+    def test_trust_initial_hash_depends_on_schema(self):
+        initial = {'data': ['ok', 'ok']}
+        initial_hash = get_initial_hash(get_form_class(trust_initial=True)(initial=initial))
+
+        class Form(forms.Form):
+            data = JSONFormField(schema={**SCHEMA, 'maxItems': 1}, trust_initial=True)
+
+        form = Form(data={'data': '["ok", "ok"]', 'data__hash': initial_hash}, initial=initial)
+        self.assertFalse(form.is_valid())
+
+    @isolate_apps('django_jsonform')
+    def test_trust_initial_hash_depends_on_instance(self):
+        Document = get_model_class()
+
+        def get_form(instance, **kwargs):
+            form = get_form_class(trust_initial=True)(initial={'data': ['ok']}, **kwargs)
+            form.fields['data'].widget.instance = instance
+            return form
+
+        initial_hash = get_initial_hash(get_form(Document(pk=1)))
+
+        form = get_form(Document(pk=1), data={'data': '["ok"]', 'data__hash': initial_hash})
+        self.assertEqual(count_validations(form), 0)
+
+        form = get_form(Document(pk=2), data={'data': '["ok"]', 'data__hash': initial_hash})
+        self.assertEqual(count_validations(form), 1)
+
+    def test_aclean(self):
+        field = JSONFormField(schema=SCHEMA)
+        self.assertEqual(asyncio.run(field.aclean('["a", "b"]')), ['a', 'b'])
+
+        with self.assertRaises(forms.ValidationError):
+            asyncio.run(field.aclean('["too long"]'))
+        self.assertIn('0', field.widget.error_map)
+
+        field = JSONFormField(schema=SCHEMA)
+        with self.assertRaises(forms.ValidationError):
+            asyncio.run(field.aclean(''))
+
+    def test_no_hash_rendered_by_default(self):
+        form = get_form_class()(initial={'data': ['a']})
+        self.assertIsNone(get_initial_hash(form))
@@ -13,6 +13,20 @@ class JSONFieldTests(TestCase):
         field.pre_save(model_instance, True)
         pre_save_hook.assert_called_once()
 
+    def test_passes_error_budget_to_form_field(self):
+        field = JSONField(schema={'type': 'array'}, max_errors=10, fail_fast=True)
+        field.model = MagicMock(__name__='Test')
+        form_field = field.formfield()
+        self.assertEqual(form_field.max_errors, 10)
+        self.assertTrue(form_field.fail_fast)
+
+    def test_passes_incremental_validation_to_form_field(self):
+        field = JSONField(schema={'type': 'array'}, incremental_validation=True, trust_initial=True)
+        field.model = MagicMock(__name__='Test')
+        form_field = field.formfield()
+        self.assertTrue(form_field.incremental_validation)
+        self.assertTrue(form_field.trust_initial)
+
 
 class ArrayFieldTests(TestCase):
     def test_allows_providing_custom_schema(self):
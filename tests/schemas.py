@@ -0,0 +1,75 @@
+"""Schema and data shared by the tests which compare the results of
+different ways of validating the same data.
+"""
+from django_jsonform.exceptions import JSONSchemaValidationError
+
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string', 'required': True, 'maxLength': 5, 'pattern': '^[a-z]'},
+        'email': {'type': 'string', 'format': 'email'},
+        'date': {'type': 'string', 'format': 'date'},
+        'color': {'type': 'string', 'choices': ['red', 'blue']},
+        'active': {'type': 'boolean'},
+        'version': {'const': 1},
+        'tags': {
+            'type': 'array',
+            'items': {'type': 'integer', 'minimum': 0, 'multipleOf': 2},
+            'uniqueItems': True,
+            'minItems': 1,
+        },
+        'prices': {'type': 'array', 'items': {'type': 'number', 'multipleOf': 0.01, 'exclusiveMaximum': 100}},
+        'pet': {'anyOf': [{'type': 'string'}, {'type': 'number'}]},
+        'children': {'type': 'array', 'items': {'$ref': '#/$defs/child'}},
+    },
+    'additionalProperties': {'type': 'number'},
+    'required': ['extra'],
+    '$defs': {
+        'child': {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string'},
+                'children': {'type': 'array', 'items': {'$ref': '#/$defs/child'}},
+            },
+        },
+    },
+}
+
+VALID_DATA = {
+    'name': 'john', 'email': 'john@example.com', 'date': '2020-01-05', 'color': 'red',
+    'active': True, 'version': 1, 'tags': [0, 2, 4], 'prices': [0.07, 19.99, 1],
+    'pet': 'dog', 'children': [{'name': 'a', 'children': [{'name': 'b', 'children': []}]}],
+    'extra': 1.5, 'other': 2,
+}
+
+INVALID_DATA = [
+    {**VALID_DATA, 'name': '', 'email': 'john', 'date': '2020-13-01', 'color': 'green'},
+    {**VALID_DATA, 'name': 'Johnny', 'active': 'yes', 'version': 2},
+    {**VALID_DATA, 'tags': [], 'prices': [0.001, 100, None, 'a']},
+    {**VALID_DATA, 'tags': [1, 2, 2, -2, 2.5, True, None]},
+    {**VALID_DATA, 'pet': ['dog'], 'extra': 'a', 'other': None},
+    {**VALID_DATA, 'children': [{'name': 1, 'children': [{'name': 2, 'children': []}]}]},
+    {**VALID_DATA, 'children': [{'name': 'a'}]},
+    {**VALID_DATA, 'tags': 'a'},
+    ['a'],
+]
+
+
+def get_errors(validate, data, ordered=True):
+    """Returns the errors of validating the data as a list of (key,
+    messages) pairs, the exception's messages or None if it's valid.
+
+    If ``ordered`` is False, the errors are returned as a dict with
+    sorted messages, so that they can be compared regardless of the
+    order they were found in.
+    """
+    try:
+        validate(data)
+    except JSONSchemaValidationError as e:
+        if e.error_map:
+            if not ordered:
+                return {key: sorted(messages) for key, messages in e.error_map.items()}
+            return list(e.error_map.items())
+        return e.messages
+    return None
@@ -0,0 +1,120 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import importlib
+from unittest import TestCase
+from django.core.management import call_command
+from django.test import override_settings
+from django_jsonform.codegen import CodeGenerator, PrecompiledSchema, write_module
+from django_jsonform.compiler import get_schema_cache
+from django_jsonform.validators import JSONSchemaValidator
+from django_jsonform.exceptions import JSONSchemaValidationError
+from tests.schemas import SCHEMA, VALID_DATA, INVALID_DATA, get_errors
+
+
+class CodeGeneratorTests(TestCase):
+    """Tests for codegen.CodeGenerator class"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.package_dir = os.path.join(cls.directory, 'jsonform_generated')
+        os.makedirs(cls.package_dir)
+        open(os.path.join(cls.package_dir, '__init__.py'), 'w').close()
+        sys.path.insert(0, cls.directory)
+
+    @classmethod
+    def tearDownClass(cls):
+        sys.path.remove(cls.directory)
+        for name in list(sys.modules):
+            if name.startswith('jsonform_generated'):
+                del sys.modules[name]
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        get_schema_cache().clear()
+
+    def tearDown(self):
+        get_schema_cache().clear()
+
+    def test_generated_code_gives_same_results_as_interpreter(self):
+        generator = write_module(SCHEMA, self.package_dir)
+        importlib.invalidate_caches()
+
+        # only the anyOf uses the interpreter
+        self.assertEqual(generator.fallback_count, 1)
+
+        interpreted = JSONSchemaValidator(SCHEMA)
+        self.assertNotIsInstance(interpreted.compile(), PrecompiledSchema)
+
+        with override_settings(DJANGO_JSONFORM={'PRECOMPILED_VALIDATORS': 'jsonform_generated'}):
+            precompiled = JSONSchemaValidator(SCHEMA)
+            self.assertIsInstance(precompiled.compile(), PrecompiledSchema)
+
+            self.assertIsNone(get_errors(precompiled, VALID_DATA))
+
+            for data in INVALID_DATA:
+                errors = get_errors(precompiled, data)
+                self.assertIsNotNone(errors)
+                self.assertEqual(errors, get_errors(interpreted, data))
+
+            # options of the validator work with precompiled code too
+            validator = JSONSchemaValidator(SCHEMA, max_errors=2)
+            with self.assertRaises(JSONSchemaValidationError) as cm:
+                validator(INVALID_DATA[0])
+            self.assertEqual(len(cm.exception.error_map), 2)
+
+    def test_missing_or_stale_module_falls_back_to_interpreter(self):
+        schema = {'type': 'array', 'items': {'type': 'string'}}
+
+        with override_settings(DJANGO_JSONFORM={'PRECOMPILED_VALIDATORS': 'jsonform_generated'}):
+            self.assertNotIsInstance(JSONSchemaValidator(schema).compile(), PrecompiledSchema)
+
+        with override_settings(DJANGO_JSONFORM={'PRECOMPILED_VALIDATORS': 'jsonform_missing'}):
+            self.assertNotIsInstance(JSONSchemaValidator(schema).compile(), PrecompiledSchema)
+
+    def test_unsupported_values_use_interpreter(self):
+        schema = {'type': 'array', 'items': {'type': 'number', 'maximum': float('inf')}}
+        generator = CodeGenerator(schema)
+        generator.generate()
+        self.assertEqual(generator.fallback_count, 1)
+
+    def test_command(self):
+        output_dir = os.path.join(self.directory, 'command_output')
+        out = io.StringIO()
+
+        with patch_model_fields():
+            call_command('jsonform_compile', output_dir=output_dir, stdout=out)
+
+        self.assertIn('Wrote 1 module(s)', out.getvalue())
+        self.assertIn('__init__.py', os.listdir(output_dir))
+        self.assertEqual(
+            len([name for name in os.listdir(output_dir) if name.startswith('schema_')]),
+            1
+        )
+
+
+class patch_model_fields:
+    """Adds a model with a JSONField to the django_jsonform app
+    for the duration of the test.
+    """
+    def __enter__(self):
+        from django.apps import apps
+        from django.db import models
+        from django_jsonform.models.fields import JSONField
+
+        class Item(models.Model):
+            data = JSONField(schema=SCHEMA)
+            dynamic = JSONField(schema=lambda: SCHEMA)
+
+            class Meta:
+                app_label = 'django_jsonform'
+
+        self.apps = apps
+        return Item
+
+    def __exit__(self, *args):
+        del self.apps.all_models['django_jsonform']['item']
+        self.apps.clear_cache()
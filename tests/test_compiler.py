@@ -0,0 +1,505 @@
+import copy
+import datetime
+from unittest import TestCase
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.test import override_settings
+from django_jsonform.compiler import (compile_schema, get_compiled_schema,
+    get_schema_cache, get_ref_tokens, get_date, get_time, get_datetime, ChoiceSet, ValidationContext, ArrayNode, ObjectNode, StringNode, IntegerNode, OneOfNode,
+    UnsupportedNode, is_unchanged)
+from django_jsonform.forms.fields import JSONFormField
+from django_jsonform.validators import JSONSchemaValidator
+from django_jsonform.exceptions import JSONSchemaValidationError
+from django_jsonform.utils import join_coords
+
+
+class CompileSchemaTests(TestCase):
+    """Tests for compiler.compile_schema function"""
+
+    def test_builds_node_tree(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'minLength': 2},
+                'tags': {'type': 'list', 'items': {'type': 'integer'}},
+                'pet': {'oneOf': [{'type': 'string'}, {'type': 'integer'}]},
+            },
+            'required': ['name'],
+        }
+        root = compile_schema(schema)
+
+        self.assertIsInstance(root, ObjectNode)
+        self.assertIsInstance(root.properties['name'], StringNode)
+        self.assertTrue(root.properties['name'].required)
+        self.assertEqual(root.properties['name'].min_length, 2)
+        self.assertIsInstance(root.properties['tags'], ArrayNode)
+        self.assertIsInstance(root.properties['tags'].items, IntegerNode)
+        self.assertIsInstance(root.properties['pet'], OneOfNode)
+        self.assertEqual(len(root.properties['pet'].branches), 2)
+
+    def test_refs_are_resolved_once(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'a': {'$ref': '#/$defs/name'},
+                'b': {'$ref': '#/$defs/name'},
+            },
+            '$defs': {'name': {'type': 'string'}}
+        }
+        root = compile_schema(schema)
+
+        self.assertIsInstance(root.properties['a'], StringNode)
+        self.assertIs(root.properties['a'], root.properties['b'])
+
+    def test_ref_json_pointer_escaping(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'a': {'$ref': '#/$defs/a~1b'},
+                'b': {'$ref': '#/$defs/c~0d'},
+                'c': {'$ref': '#/$defs/e%20f'},
+                'd': {'$ref': '#/$defs/list/1'},
+            },
+            '$defs': {
+                'a/b': {'type': 'string'},
+                'c~d': {'type': 'integer'},
+                'e f': {'type': 'boolean'},
+                'list': [{'type': 'string'}, {'type': 'number'}],
+            }
+        }
+        root = compile_schema(schema)
+
+        self.assertIsInstance(root.properties['a'], StringNode)
+        self.assertIsInstance(root.properties['b'], IntegerNode)
+        self.assertEqual(type(root.properties['c']).__name__, 'BooleanNode')
+        self.assertEqual(type(root.properties['d']).__name__, 'NumberNode')
+
+    def test_get_ref_tokens(self):
+        self.assertEqual(get_ref_tokens('#'), [])
+        self.assertEqual(get_ref_tokens('#/$defs/a'), ['$defs', 'a'])
+        self.assertEqual(get_ref_tokens('#/$defs/a~1b~0c'), ['$defs', 'a/b~c'])
+        self.assertEqual(get_ref_tokens('#/%24defs/a%25'), ['$defs', 'a%'])
+
+    def test_chained_refs(self):
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/a'},
+            '$defs': {
+                'a': {'$ref': '#/$defs/b'},
+                'b': {'type': 'string'},
+            }
+        }
+        root = compile_schema(schema)
+        self.assertIsInstance(root.items, StringNode)
+
+    def test_invalid_refs(self):
+        # dangling ref
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/missing'},
+            '$defs': {}
+        }
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'missing'):
+            compile_schema(schema)
+
+        # circular ref
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/a'},
+            '$defs': {
+                'a': {'$ref': '#/$defs/b'},
+                'b': {'$ref': '#/$defs/a'},
+            }
+        }
+        self.assertRaises(JSONSchemaValidationError, compile_schema, schema)
+
+        # $ref-like values in data keywords are not refs
+        schema = {
+            'type': 'object',
+            'properties': {'a': {'const': {'$ref': '#/nowhere'}}}
+        }
+        compile_schema(schema) # must not fail
+
+    def test_recursive_refs(self):
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/node'},
+            '$defs': {
+                'node': {
+                    'type': 'object',
+                    'properties': {
+                        'name': {'type': 'string'},
+                        'children': {
+                            'type': 'array',
+                            'items': {'$ref': '#/$defs/node'}
+                        }
+                    }
+                }
+            }
+        }
+        root = compile_schema(schema)
+        self.assertIs(root.items, root.items.properties['children'].items)
+
+        validator = JSONSchemaValidator(schema)
+        validator([{'name': 'a', 'children': [{'name': 'b', 'children': []}]}])
+        self.assertRaises(
+            JSONSchemaValidationError,
+            validator,
+            [{'name': 'a', 'children': [{'name': 1, 'children': []}]}]
+        )
+
+    def test_unsupported_types_compile_to_placeholder(self):
+        schema = {'type': 'array', 'items': {'type': 'null'}}
+        root = compile_schema(schema)
+        self.assertIsInstance(root.items, UnsupportedNode)
+
+        validator = JSONSchemaValidator(schema)
+        validator([]) # nothing to validate
+        self.assertRaises(JSONSchemaValidationError, validator, [None])
+
+    def test_compiled_schema_does_not_share_values_with_schema(self):
+        schema = {
+            'type': 'object',
+            'properties': {'a': {'const': ['x', 'y']}}
+        }
+        root = compile_schema(schema)
+        schema['properties']['a']['const'].append('z')
+
+        self.assertEqual(root.properties['a'].const, ['x', 'y'])
+
+    def test_outermost_type_must_be_array_or_object(self):
+        self.assertRaises(JSONSchemaValidationError, compile_schema, {'type': 'string'})
+
+    def test_validator_compiles_schema_once(self):
+        validator = JSONSchemaValidator({'type': 'array', 'items': {'type': 'string'}})
+        validator(['a'])
+        root = validator.compile()
+        validator(['b'])
+        self.assertIs(validator.compile(), root)
+
+
+class IsValidTests(TestCase):
+    """Tests for the is_valid method of the nodes"""
+
+    def test_agrees_with_validate(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'required': True, 'maxLength': 5},
+                'tags': {'type': 'array', 'items': {'type': 'integer'}, 'uniqueItems': True},
+                'pet': {'anyOf': [{'type': 'string'}, {'type': 'number', 'minimum': 0}]},
+            }
+        }
+        root = compile_schema(schema)
+        validator = JSONSchemaValidator(schema)
+
+        valid_data = [
+            {'name': 'john', 'tags': [1, 2], 'pet': 'dog'},
+            {'name': 'jane', 'tags': [], 'pet': 3},
+        ]
+        invalid_data = [
+            {'name': '', 'tags': [], 'pet': 'dog'},
+            {'name': 'too long', 'tags': [], 'pet': 'dog'},
+            {'name': 'john', 'tags': [1, 1], 'pet': 'dog'},
+            {'name': 'john', 'tags': ['1'], 'pet': 'dog'},
+            {'name': 'john', 'tags': [], 'pet': -1},
+            {'name': 'john', 'tags': []},
+            ['john'],
+        ]
+
+        for data in valid_data:
+            self.assertTrue(root.is_valid(data))
+            validator(data)
+
+        for data in invalid_data:
+            self.assertFalse(root.is_valid(data))
+            self.assertRaises(JSONSchemaValidationError, validator, data)
+
+    def test_union_branches_are_tried_without_errors(self):
+        schema = {
+            'type': 'array',
+            'items': {
+                'oneOf': [
+                    {'type': 'object', 'properties': {'a': {'type': 'string'}}},
+                    {'type': 'array', 'items': {'type': 'string', 'required': True}},
+                ]
+            }
+        }
+        root = compile_schema(schema)
+
+        with patch('django_jsonform.compiler.type_mismatch_error') as type_mismatch_error, \
+                patch.object(ValidationContext, 'add_error') as add_error:
+            root.validate([['x'], ['y'], {'a': 'z'}], None, ValidationContext())
+
+        type_mismatch_error.assert_not_called()
+        add_error.assert_not_called()
+
+
+class DiscriminatorTests(TestCase):
+    """Tests for oneOf/anyOf dispatch by discriminator"""
+
+    def get_schema(self, **kwargs):
+        schema = {
+            'type': 'array',
+            'items': {
+                'oneOf': [
+                    {'$ref': '#/$defs/cat'},
+                    {'$ref': '#/$defs/dog'},
+                ],
+            },
+            '$defs': {
+                'cat': {
+                    'type': 'object',
+                    'properties': {
+                        'kind': {'const': 'cat'},
+                        'lives': {'type': 'integer'},
+                    },
+                },
+                'dog': {
+                    'type': 'object',
+                    'properties': {
+                        'kind': {'const': 'dog'},
+                        'breed': {'type': 'string'},
+                    },
+                },
+            },
+        }
+        schema['items'].update(kwargs)
+        return schema
+
+    def test_detected_from_const_properties(self):
+        root = compile_schema(self.get_schema())
+        node = root.items
+
+        self.assertEqual(node.discriminator, 'kind')
+        self.assertEqual(set(node.mapping), {'cat', 'dog'})
+
+        cat, dog = node.branches
+        with patch.object(cat, 'is_valid', wraps=cat.is_valid) as cat_is_valid:
+            self.assertTrue(node.is_valid({'kind': 'dog', 'breed': 'pug'}))
+        cat_is_valid.assert_not_called()
+
+    def test_explicit_discriminator_with_mapping(self):
+        schema = self.get_schema(discriminator={
+            'propertyName': 'kind',
+            'mapping': {'cat': '#/$defs/cat', 'dog': '#/$defs/dog'},
+        })
+        root = compile_schema(schema)
+        node = root.items
+
+        self.assertEqual(node.discriminator, 'kind')
+        self.assertIs(node.mapping['cat'], node.branches[0])
+        self.assertIs(node.mapping['dog'], node.branches[1])
+
+    def test_results_are_same_as_without_discriminator(self):
+        validator = JSONSchemaValidator(self.get_schema())
+
+        validator([{'kind': 'cat', 'lives': 9}, {'kind': 'dog', 'breed': 'pug'}])
+
+        invalid_data = [
+            [{'kind': 'cat', 'breed': 'pug'}],
+            [{'kind': 'cat', 'lives': 'nine'}],
+            [{'kind': 'bird', 'breed': 'pug'}],
+            [{'kind': ['cat'], 'lives': 9}],
+            [{'lives': 9}],
+            ['cat'],
+        ]
+        for data in invalid_data:
+            self.assertRaises(JSONSchemaValidationError, validator, data)
+
+    def test_reports_errors_of_selected_branch(self):
+        validator = JSONSchemaValidator(self.get_schema())
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator([{'kind': 'dog', 'breed': 'pug'}, {'kind': 'cat', 'lives': 'x'}])
+        self.assertEqual(list(cm.exception.error_map.keys()), [join_coords(1, 'lives')])
+
+        # no branch for the discriminator's value
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator([{'kind': 'bird', 'lives': 1}])
+        self.assertEqual(list(cm.exception.error_map.keys()), ['0'])
+
+    def test_no_discriminator_without_distinct_consts(self):
+        schema = self.get_schema()
+        schema['$defs']['dog']['properties']['kind']['const'] = 'cat'
+        self.assertIsNone(compile_schema(schema).items.discriminator)
+
+        schema = self.get_schema()
+        schema['$defs']['dog']['properties']['kind'] = {'type': 'string'}
+        self.assertIsNone(compile_schema(schema).items.discriminator)
+
+
+class BatchValidationTests(TestCase):
+    """Tests for checking numeric arrays in a batch"""
+
+    def test_valid_items_are_not_checked_one_by_one(self):
+        root = compile_schema({'type': 'array', 'items': {'type': 'number', 'minimum': 0, 'maximum': 10}})
+
+        with patch.object(root.items, 'check') as check:
+            root.validate([0, 1.5, 10], None, ValidationContext())
+            self.assertTrue(root.is_valid([0, 1.5, 10]))
+        check.assert_not_called()
+
+    def test_same_results_as_checking_one_by_one(self):
+        item_schemas = [
+            {'type': 'number', 'minimum': 0, 'maximum': 10},
+            {'type': 'number', 'exclusiveMinimum': 0, 'exclusiveMaximum': 10},
+            {'type': 'number'},
+            {'type': 'integer', 'minimum': -5},
+            {'type': 'integer', 'required': True},
+        ]
+        lists = [
+            [0, 1, 10], [0.5, 9.5], [0, 11], [-1, 5], [10, 10.0], [1, 2.5],
+            [float('nan'), 20], [20, float('nan')], [float('inf')], [True, 1], [None, 1],
+            [1, 'a'], [2.0, 3], [-6, 1],
+        ]
+
+        for item_schema in item_schemas:
+            node = compile_schema({'type': 'array', 'items': item_schema}).items
+            for items in lists:
+                expected = all(not node.check(item) for item in items)
+                if node.is_valid_batch(items):
+                    self.assertTrue(expected, (item_schema, items))
+
+
+class DateTimeParserTests(TestCase):
+    """Tests for compiler.get_date, get_time and get_datetime functions"""
+
+    def assertSameAsStrptime(self, func, formats, values):
+        for value in values:
+            expected = None
+            for format_ in formats:
+                try:
+                    expected = datetime.datetime.strptime(value, format_)
+                    break
+                except ValueError:
+                    continue
+
+            if expected is not None:
+                expected = expected.date() if func is get_date else expected.time()
+
+            self.assertEqual(func(value), expected, value)
+
+    def test_get_date(self):
+        self.assertSameAsStrptime(get_date, ['%Y-%m-%d'], [
+            '2020-01-05', '2020-1-5', '2020-12-31', '2024-02-29', '2023-02-29',
+            '2020-13-01', '2020-00-01', '2020-01-32', '0000-01-01', '20200-01-01',
+            '2020-01-05 ', ' 2020-01-05', '2020/01/05', '2020-01', '', 'abc',
+        ])
+
+    def test_get_time(self):
+        self.assertSameAsStrptime(get_time, ['%H:%M', '%H:%M:%S'], [
+            '12:30', '1:5', '00:00', '23:59:59', '12:30:5', '24:00', '12:60',
+            '12:30:60', '12:30:', '12:30:00.5', '12', ':30', '', 'abc',
+        ])
+
+    def test_get_datetime(self):
+        self.assertEqual(get_datetime('2020-01-05T12:30:00'), datetime.datetime(2020, 1, 5, 12, 30))
+        self.assertIsNone(get_datetime('2020-01-05T25:00:00'))
+
+    def test_repeated_values_are_cached(self):
+        get_date.cache_clear()
+        for i in range(10):
+            get_date('2020-01-05')
+        self.assertEqual(get_date.cache_info().hits, 9)
+
+    def test_long_values_are_not_cached(self):
+        get_date.cache_clear()
+        get_datetime.cache_clear()
+        # valid since Python 3.11
+        value = '2020-01-05T12:30:00.' + '1' * 1000
+        for i in range(10):
+            self.assertEqual(get_datetime(value), get_datetime.__wrapped__(value))
+            self.assertIsNone(get_date('2020-01-05' + ' ' * 1000))
+        self.assertEqual(get_datetime.cache_info().currsize, 0)
+        self.assertEqual(get_date.cache_info().currsize, 0)
+
+
+class ChoiceSetTests(TestCase):
+    """Tests for compiler.ChoiceSet class"""
+
+    def test_membership(self):
+        choices = ChoiceSet(['a', 1, 2.5, None, ['x'], {'y': 1}])
+
+        for value in ['a', 1, 2.5, None, ['x'], {'y': 1}]:
+            self.assertIn(value, choices)
+
+        for value in ['b', 3, ['y'], {'y': 2}, {}]:
+            self.assertNotIn(value, choices)
+
+    def test_unhashable_value_without_unhashable_choices(self):
+        choices = ChoiceSet(['a', 'b'])
+        self.assertNotIn(['a'], choices)
+
+
+class IsUnchangedTests(TestCase):
+    """Tests for compiler.is_unchanged function"""
+
+    def test_same_values(self):
+        for value in ['a', 1, 1.5, True, None, [], {}, [1, {'a': [True, None]}], {'a': {'b': [1.0]}}]:
+            self.assertTrue(is_unchanged(value, copy.deepcopy(value)))
+
+        self.assertTrue(is_unchanged({'a': 1, 'b': 2}, {'b': 2, 'a': 1}))
+
+    def test_changed_values(self):
+        for data, initial in [
+            (1, True), (1, 1.0), (0, False), ([1], [True]), ({'a': 1}, {'a': 1.0}),
+            ('1', 1), ([1, 2], [1]), ([1], [1, 2]), ({'a': 1}, {'b': 1}),
+            ({'a': 1}, {'a': 1, 'b': 2}), ([[1]], [[2]]), ([], {}), (float('nan'), float('nan')),
+        ]:
+            self.assertFalse(is_unchanged(data, initial), (data, initial))
+            self.assertFalse(is_unchanged(initial, data), (initial, data))
+
+
+class GetCompiledSchemaTests(TestCase):
+    """Tests for compiler.get_compiled_schema function"""
+
+    def setUp(self):
+        get_schema_cache().clear()
+
+    def test_equal_schemas_are_compiled_once(self):
+        schema_1 = {'type': 'array', 'items': {'type': 'string'}}
+        schema_2 = {'items': {'type': 'string'}, 'type': 'array'}
+
+        root = get_compiled_schema(schema_1)
+        self.assertIs(get_compiled_schema(schema_2), root)
+        self.assertEqual(get_schema_cache().info()['misses'], 1)
+        self.assertEqual(get_schema_cache().info()['hits'], 1)
+
+    def test_form_field_reuses_compiled_schema(self):
+        schema = {'type': 'array', 'items': {'type': 'string'}}
+        field = JSONFormField(schema=schema)
+
+        # the copies of the field made for the form instances
+        # share the validator, so the schema is looked up once
+        for i in range(10):
+            copy.deepcopy(field).clean('["a"]')
+
+        info = get_schema_cache().info()
+        self.assertEqual(info['misses'], 1)
+        self.assertEqual(info['hits'], 0)
+
+        # a new schema gets a new validator
+        field.widget.schema = {'type': 'array', 'items': {'type': 'number'}}
+        self.assertRaises(ValidationError, field.clean, '["a"]')
+
+        # callable schemas are looked up every time
+        field = JSONFormField(schema=lambda: schema)
+        for i in range(10):
+            field.clean('["a"]')
+
+        info = get_schema_cache().info()
+        self.assertEqual(info['misses'], 2)
+        self.assertEqual(info['hits'], 10)
+
+    def test_cache_size_setting(self):
+        with override_settings(DJANGO_JSONFORM={'VALIDATOR_CACHE_SIZE': 1}):
+            get_compiled_schema({'type': 'array', 'items': {'type': 'string'}})
+            get_compiled_schema({'type': 'array', 'items': {'type': 'number'}})
+
+            info = get_schema_cache().info()
+            self.assertEqual(info['maxsize'], 1)
+            self.assertEqual(info['size'], 1)
+            self.assertEqual(info['evictions'], 1)
+
+        self.assertEqual(get_schema_cache().info()['maxsize'], 128)
@@ -0,0 +1,103 @@
+import pickle
+import threading
+from unittest import TestCase
+from django_jsonform.exceptions import JSONSchemaValidationError
+from django_jsonform.profiling import get_schema_paths
+from django_jsonform.signals import validation_profiled
+from django_jsonform.validators import JSONSchemaValidator
+
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string', 'maxLength': 5},
+        'tags': {'type': 'array', 'items': {'type': 'integer'}, 'uniqueItems': True},
+        'pet': {'oneOf': [{'type': 'string'}, {'$ref': '#/$defs/pet'}]},
+    },
+    '$defs': {
+        'pet': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+    },
+}
+
+DATA = {'name': 'john', 'tags': [1, 2], 'pet': {'name': 'rex'}}
+
+
+class ProfilingTests(TestCase):
+    def test_records_counts_per_path_and_keyword(self):
+        validator = JSONSchemaValidator(SCHEMA, profile=True)
+        validator(DATA)
+        validator(DATA)
+
+        profile = validator.get_profile()
+
+        self.assertEqual(profile['#']['type']['count'], 2)
+        self.assertEqual(profile['#/properties/name']['maxLength']['count'], 2)
+        self.assertEqual(profile['#/properties/tags']['uniqueItems']['count'], 2)
+        self.assertEqual(profile['#/properties/pet']['oneOf']['count'], 2)
+        # the $ref branch is reported at the path of its target
+        self.assertEqual(profile['#/$defs/pet']['type']['count'], 2)
+
+        for keywords in profile.values():
+            for stats in keywords.values():
+                self.assertGreaterEqual(stats['time'], 0)
+
+        # the time of a node includes its children
+        self.assertGreaterEqual(
+            profile['#']['type']['time'], profile['#/properties/pet']['oneOf']['time']
+        )
+
+        validator.reset_profile()
+        self.assertEqual(validator.get_profile(), {})
+
+    def test_invalid_data_is_profiled(self):
+        validator = JSONSchemaValidator(SCHEMA, profile=True)
+        self.assertRaises(JSONSchemaValidationError, validator, {**DATA, 'name': 'too long'})
+        self.assertEqual(validator.get_profile()['#/properties/name']['maxLength']['count'], 1)
+
+    def test_signal(self):
+        validator = JSONSchemaValidator(SCHEMA, profile=True)
+        profiles = []
+
+        def receiver(sender, validator, profile, **kwargs):
+            profiles.append(profile)
+
+        validation_profiled.connect(receiver)
+        try:
+            validator(DATA)
+            validator(DATA)
+            JSONSchemaValidator(SCHEMA)(DATA)
+        finally:
+            validation_profiled.disconnect(receiver)
+
+        # one profile for each run of the profiled validator
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(profiles[1]['#']['type']['count'], 1)
+
+    def test_runs_in_threads_are_recorded_separately(self):
+        validator = JSONSchemaValidator(SCHEMA, profile=True)
+        threads = [threading.Thread(target=validator, args=(DATA,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(validator.get_profile()['#']['type']['count'], 4)
+
+    def test_disabled_by_default(self):
+        validator = JSONSchemaValidator(SCHEMA)
+        validator(DATA)
+        self.assertEqual(validator.get_profile(), {})
+
+    def test_profiled_validator_can_be_pickled(self):
+        validator = JSONSchemaValidator(SCHEMA, profile=True)
+        validator(DATA)
+
+        copied = pickle.loads(pickle.dumps(validator))
+        copied(DATA)
+        self.assertEqual(copied.get_profile()['#']['type']['count'], 1)
+
+    def test_schema_paths(self):
+        paths = get_schema_paths(SCHEMA)
+        self.assertEqual(paths[id(SCHEMA)], '#')
+        self.assertEqual(paths[id(SCHEMA['properties']['tags']['items'])], '#/properties/tags/items')
+        self.assertEqual(paths[id(SCHEMA['properties']['pet']['oneOf'][1])], '#/properties/pet/oneOf/1')
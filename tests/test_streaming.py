@@ -0,0 +1,84 @@
+import io
+import json
+import sys
+import unittest
+from unittest import TestCase
+from unittest.mock import patch
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django_jsonform.validators import JSONSchemaValidator
+from django_jsonform.exceptions import JSONSchemaValidationError
+from tests.schemas import SCHEMA, VALID_DATA, INVALID_DATA, get_errors
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+class EndlessArray:
+    """A file which contains an array of one integer followed by
+    an endless number of strings.
+    """
+    def __init__(self):
+        self.reads = 0
+
+    def read(self, size):
+        if not size:
+            return b''
+        self.reads += 1
+        if self.reads > 100:
+            raise AssertionError('Parsing did not stop')
+        if self.reads == 1:
+            return b'[1'
+        return b', "x"' * max(size // 5, 1)
+
+
+@unittest.skipIf(ijson is None, 'ijson is not installed')
+class StreamingValidationTests(TestCase):
+    def test_gives_same_results_as_validate(self):
+        validator = JSONSchemaValidator(SCHEMA)
+
+        def validate_stream(data):
+            validator.validate_stream(json.dumps(data).encode())
+
+        self.assertIsNone(get_errors(validate_stream, VALID_DATA, ordered=False))
+
+        for data in INVALID_DATA:
+            errors = get_errors(validate_stream, data, ordered=False)
+            self.assertIsNotNone(errors)
+            self.assertEqual(errors, get_errors(validator.validate, data, ordered=False))
+
+        with override_settings(DJANGO_JSONFORM={'VALIDATOR_ENGINE': 'iterative'}):
+            for data in INVALID_DATA:
+                self.assertEqual(get_errors(validate_stream, data, ordered=False), get_errors(validator.validate, data, ordered=False))
+
+    def test_keep(self):
+        validator = JSONSchemaValidator(SCHEMA)
+        source = io.BytesIO(json.dumps(VALID_DATA).encode())
+        self.assertEqual(validator.validate_stream(source, keep=True), VALID_DATA)
+
+        self.assertIsNone(validator.validate_stream(json.dumps(VALID_DATA)))
+
+    def test_stops_parsing_early(self):
+        schema = {'type': 'array', 'items': {'type': 'integer'}}
+        source = EndlessArray()
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema, fail_fast=True).validate_stream(source)
+        self.assertEqual(list(cm.exception.error_map.keys()), ['1'])
+
+        with self.assertRaises(JSONSchemaValidationError):
+            JSONSchemaValidator(schema, max_nodes=1000).validate_stream(EndlessArray())
+
+    def test_invalid_json(self):
+        validator = JSONSchemaValidator({'type': 'array'})
+        self.assertRaises(JSONSchemaValidationError, validator.validate_stream, b'[1, 2')
+        self.assertRaises(JSONSchemaValidationError, validator.validate_stream, b'[1, }')
+
+
+class StreamingWithoutParserTests(TestCase):
+    def test_requires_ijson(self):
+        validator = JSONSchemaValidator({'type': 'array'})
+        with patch.dict(sys.modules, {'ijson': None}):
+            self.assertRaises(ImproperlyConfigured, validator.validate_stream, b'[]')
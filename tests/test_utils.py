@@ -1,6 +1,8 @@
 from unittest import TestCase
 from django_jsonform.utils import (normalize_schema, join_coords, split_coords,
-    ErrorMap)
+    ErrorMap, Coords, get_schema_fingerprint, freeze_value, find_duplicates,
+    LRUCache, count_values)
+from django.utils.translation import gettext_lazy
 from django_jsonform.constants import JOIN_SYMBOL
 
 
@@ -55,6 +57,18 @@ class TestSplitCoordsFunction(TestCase):
         self.assertEqual(split_coords('a%sb' % JOIN_SYMBOL), ['a', 'b'])
 
 
+class TestCoordsClass(TestCase):
+    """Tests for Coords class"""
+
+    def test_to_list(self):
+        coords = Coords(Coords(Coords(None, 0), 'name'), 1)
+        self.assertEqual(coords.to_list(), [0, 'name', 1])
+
+    def test_str(self):
+        coords = Coords(Coords(None, 0), 'name')
+        self.assertEqual(str(coords), join_coords(0, 'name'))
+
+
 class TestErrorMapClass(TestCase):
     """Tests for ErrorMap class"""
 
@@ -76,3 +90,96 @@ class TestErrorMapClass(TestCase):
             error_map, 
             {join_coords(0, 'name'): ['Error 1', 'Error 2']}
         )
+
+
+class TestGetSchemaFingerprintFunction(TestCase):
+    """Tests for get_schema_fingerprint function"""
+
+    def test_equal_schemas_have_same_fingerprint(self):
+        schema_1 = {'type': 'string', 'title': 'Name'}
+        schema_2 = {'title': 'Name', 'type': 'string'}
+        self.assertEqual(get_schema_fingerprint(schema_1), get_schema_fingerprint(schema_2))
+
+    def test_different_schemas_have_different_fingerprints(self):
+        schema_1 = {'type': 'string', 'minLength': 1}
+        schema_2 = {'type': 'string', 'minLength': 2}
+        self.assertNotEqual(get_schema_fingerprint(schema_1), get_schema_fingerprint(schema_2))
+
+    def test_lazy_translations(self):
+        schema_1 = {'type': 'string', 'title': gettext_lazy('Name')}
+        schema_2 = {'type': 'string', 'title': 'Name'}
+        self.assertEqual(get_schema_fingerprint(schema_1), get_schema_fingerprint(schema_2))
+
+
+class TestFreezeValueFunction(TestCase):
+    """Tests for freeze_value function"""
+
+    def test_dict_key_order_is_ignored(self):
+        self.assertEqual(
+            freeze_value({'a': 1, 'b': [1, {'c': 2, 'd': 3}]}),
+            freeze_value({'b': [1, {'d': 3, 'c': 2}], 'a': 1})
+        )
+
+    def test_list_order_is_kept(self):
+        self.assertNotEqual(freeze_value([1, 2]), freeze_value([2, 1]))
+
+    def test_booleans_are_not_numbers(self):
+        self.assertNotEqual(freeze_value(True), freeze_value(1))
+        self.assertNotEqual(freeze_value([False]), freeze_value([0]))
+        self.assertEqual(freeze_value(1), freeze_value(1.0))
+
+
+class TestFindDuplicatesFunction(TestCase):
+    """Tests for find_duplicates function"""
+
+    def test_returns_duplicate_indices(self):
+        items = [{'a': 1, 'b': 2}, {'a': 2}, {'b': 2, 'a': 1}, {'a': 2}, {'a': 1, 'b': 2}]
+        self.assertEqual(find_duplicates(items), [(2, 0), (3, 1), (4, 0)])
+
+    def test_no_duplicates(self):
+        self.assertEqual(find_duplicates([[1], [2], [1, 2], True, 1]), [])
+
+
+class TestCountValuesFunction(TestCase):
+    """Tests for utils.count_values function"""
+
+    def test_counts_nested_values(self):
+        self.assertEqual(count_values('a', 10), 1)
+        self.assertEqual(count_values([1, {'a': [2, 3], 'b': 'c'}], 10), 7)
+
+    def test_stops_over_limit(self):
+        self.assertEqual(count_values([[1, 2], list(range(1000))], 5), 1003)
+        self.assertGreater(count_values([[list(range(10))] * 1000], 50), 50)
+
+
+class TestLRUCacheClass(TestCase):
+    """Tests for LRUCache class"""
+
+    def test_evicts_least_recently_used_item(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a') # 'b' is now the least recently used
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_info(self):
+        cache = LRUCache(1)
+        cache.get('a')
+        cache.set('a', 1)
+        cache.get('a')
+        cache.set('b', 2)
+
+        self.assertEqual(
+            cache.info(),
+            {'hits': 1, 'misses': 1, 'evictions': 1, 'size': 1, 'maxsize': 1}
+        )
+
+    def test_zero_maxsize_disables_caching(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
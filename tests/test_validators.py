@@ -1,23 +1,502 @@
+import asyncio
+import copy
+import itertools
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from unittest import TestCase
+from unittest.mock import patch
+from django.test import override_settings
+from django.utils import translation
 from django_jsonform.validators import JSONSchemaValidator
+from django_jsonform.compiler import ValidationContext
+from django_jsonform.utils import Coords, join_coords
 from django_jsonform.exceptions import JSONSchemaValidationError
 
 
 class TestJSONSchemaValidator(TestCase):
     """Tests for JSONSchemaValidator class"""
     def test_add_error_method(self):
-        """JSONSchemaValidator.add_error method must create a list for 
+        """ValidationContext.add_error method must create a list for
         the given key. All the error messages for thay key must be appended
         to that list.
         """
-        validator = JSONSchemaValidator(None)
-        validator.add_error('key', 'error message')
-        self.assertIsInstance(validator.error_map['key'], list)
-        self.assertEqual(validator.error_map['key'][0], 'error message')
+        context = ValidationContext()
+        coords = Coords(None, 'key')
+        context.add_error(coords, 'error message')
+        self.assertIsInstance(context.error_map['key'], list)
+        self.assertEqual(context.error_map['key'][0], 'error message')
+        context.add_error(coords, 'second message')
+        self.assertEqual(context.error_map['key'], ['error message', 'second message'])
+
+    def test_error_map_coords(self):
+        schema = {
+            'type': 'array',
+            'minItems': 3,
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'tags': {'type': 'array', 'items': {'type': 'string'}}
+                }
+            }
+        }
+        validator = JSONSchemaValidator(schema)
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator([{'tags': ['a', 1]}, {'tags': [2]}])
+
+        self.assertEqual(
+            cm.exception.error_map,
+            {
+                '': ['Minimum 3 items required.'],
+                join_coords(0, 'tags', 1): ['This value is invalid. Must be a valid string.'],
+                join_coords(1, 'tags', 0): ['This value is invalid. Must be a valid string.'],
+            }
+        )
+
+    def test_concurrent_validation_with_one_instance(self):
+        """A single validator instance must keep errors of simultaneous
+        validation runs apart.
+        """
+        schema = {'type': 'array', 'items': {'type': 'string', 'maxLength': 3}}
+        validator = JSONSchemaValidator(schema)
+        barrier = threading.Barrier(8)
+        results = {}
+
+        def run(index):
+            barrier.wait()
+            data = ['ok'] * 200
+            if index % 2:
+                data[index] = 'too long'
+            try:
+                validator(data)
+            except JSONSchemaValidationError as e:
+                results[index] = e.error_map
+            else:
+                results[index] = None
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index in range(8):
+            if index % 2:
+                self.assertEqual(list(results[index].keys()), [str(index)])
+            else:
+                self.assertIsNone(results[index])
+
+    def test_max_errors(self):
+        """Validation must stop once more than max_errors errors have
+        been found and the error_map must be marked as truncated.
+        """
+        schema = {'type': 'array', 'items': {'type': 'string', 'maxLength': 3}}
+        data = ['too long'] * 100
+
+        validator = JSONSchemaValidator(schema, max_errors=5)
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(data)
+        self.assertEqual(list(cm.exception.error_map.keys()), ['0', '1', '2', '3', '4'])
+        self.assertTrue(cm.exception.error_map.truncated)
+
+        # as many errors as the budget, none is left out
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(['too long'] * 5 + ['ok'])
+        self.assertEqual(list(cm.exception.error_map.keys()), ['0', '1', '2', '3', '4'])
+        self.assertFalse(cm.exception.error_map.truncated)
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema, fail_fast=True)(['ok', 'too long'])
+        self.assertFalse(cm.exception.error_map.truncated)
+
+        # less errors than the budget
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(['ok', 'too long', 'ok'])
+        self.assertEqual(list(cm.exception.error_map.keys()), ['1'])
+        self.assertFalse(cm.exception.error_map.truncated)
+
+        # no budget
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema)(data)
+        self.assertEqual(len(cm.exception.error_map), 100)
+        self.assertFalse(cm.exception.error_map.truncated)
+
+    def test_fail_fast(self):
+        schema = {'type': 'array', 'items': {'type': 'string', 'maxLength': 3}}
+        validator = JSONSchemaValidator(schema, fail_fast=True)
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(['ok', 'too long', 'too long'])
+        self.assertEqual(list(cm.exception.error_map.keys()), ['1'])
+        self.assertTrue(cm.exception.error_map.truncated)
+
+        validator(['ok', 'ok'])
+
+    def test_incremental_validation(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'maxLength': 3},
+                'flag': {'type': 'integer'},
+                'items': {
+                    'type': 'array',
+                    'items': {'type': 'string', 'maxLength': 3},
+                    'uniqueItems': True,
+                },
+            }
+        }
+        validator = JSONSchemaValidator(schema)
+
+        # the initial value is trusted, so unchanged invalid parts aren't reported
+        initial = {'name': 'too long', 'flag': 1, 'items': ['too long', 'a']}
+        validator.validate({'name': 'too long', 'flag': 1, 'items': ['too long', 'b']}, initial)
+
+        # changed values are validated
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator.validate({'name': 'too long', 'flag': 1, 'items': ['too long', 'long']}, initial)
+        self.assertEqual(list(cm.exception.error_map.keys()), [join_coords('items', 1)])
+
+        # checks of the containers run even if their items didn't change
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator.validate({'name': 'too long', 'flag': 1, 'items': ['a', 'a']}, initial)
+        self.assertIn('items', cm.exception.error_map)
+
+        # True is equal to 1 in Python, but it's a changed value
+        self.assertRaises(
+            JSONSchemaValidationError,
+            validator.validate, {'name': 'ok', 'flag': True, 'items': []}, initial
+        )
+
+        # added keys and items are validated
+        self.assertRaises(
+            JSONSchemaValidationError,
+            validator.validate, {'name': 'ok', 'items': ['a', 'b', 'long']}, {'name': 'ok', 'items': ['a', 'b']}
+        )
+
+    def test_resource_limits(self):
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/node'},
+            '$defs': {
+                'node': {
+                    'type': 'object',
+                    'properties': {
+                        'name': {'type': 'string'},
+                        'children': {'type': 'array', 'items': {'$ref': '#/$defs/node'}}
+                    }
+                }
+            }
+        }
+
+        def make_tree(depth, name='a'):
+            node = {'name': name, 'children': []}
+            if depth > 1:
+                node['children'].append(make_tree(depth - 1, name))
+            return node
+
+        data = [make_tree(5)] # 11 levels of arrays and objects
+
+        JSONSchemaValidator(schema, max_depth=11)(data)
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'nested too deeply'):
+            JSONSchemaValidator(schema, max_depth=10)(data)
+
+        # 1 + 1 + 5 * 2 + 4 values
+        JSONSchemaValidator(schema, max_nodes=16)(data)
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'too large'):
+            JSONSchemaValidator(schema, max_nodes=15)(data)
+
+        JSONSchemaValidator(schema, max_string_length=1)(data)
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'longer than 1'):
+            JSONSchemaValidator(schema, max_string_length=1)([make_tree(5, 'ab')])
+
+        JSONSchemaValidator(schema, time_limit=60)(data)
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'too long to validate'):
+            JSONSchemaValidator(schema, time_limit=-1)(data)
+
+        # limits from settings
+        with override_settings(DJANGO_JSONFORM={'VALIDATOR_LIMITS': {'MAX_DEPTH': 10}}):
+            self.assertRaises(JSONSchemaValidationError, JSONSchemaValidator(schema), data)
+            JSONSchemaValidator(schema, max_depth=11)(data)
+
+    def test_limits_in_union_branches(self):
+        schema = {'oneOf': [{'type': 'array', 'items': {'type': 'string'}}, {'type': 'string'}]}
+
+        JSONSchemaValidator(schema, max_nodes=10)(['a'] * 9)
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'too large') as cm:
+            JSONSchemaValidator(schema, max_nodes=10)(['a'] * 1000)
+        self.assertEqual(cm.exception.code, 'limit_exceeded')
+
+        JSONSchemaValidator(schema, max_string_length=5)('x' * 5)
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'longer than 5'):
+            JSONSchemaValidator(schema, max_string_length=5)('x' * 100)
+
+        # other errors in a branch only mean that the data doesn't match it
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema, max_nodes=10)([1])
+        self.assertEqual(list(cm.exception.error_map.keys()), [''])
+
+    def test_time_limit_checked_while_iterating(self):
+        schema = {'type': 'array', 'items': {'type': 'string', 'format': 'email'}}
+        data = ['a@example.com'] * 1000
+
+        for engine in ('recursive', 'iterative'):
+            with self.subTest(engine=engine):
+                # every call of the clock advances it by one second
+                with patch('django_jsonform.compiler.time.monotonic', side_effect=itertools.count()):
+                    with self.assertRaisesRegex(JSONSchemaValidationError, 'too long to validate'):
+                        JSONSchemaValidator(schema, time_limit=5, engine=engine)(data)
+
+    def test_recursion_limit_is_a_validation_error(self):
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/list'},
+            '$defs': {'list': {'type': 'array', 'items': {'$ref': '#/$defs/list'}}}
+        }
+        data = []
+        for i in range(5000):
+            data = [data]
+
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'nested too deeply'):
+            JSONSchemaValidator(schema)(data)
+
+    def test_validate_many(self):
+        schema = {'type': 'array', 'items': {'type': 'integer'}}
+        validator = JSONSchemaValidator(schema)
+        values = [[1, 2], ['a'], [], [1, 'b']] * 10
+
+        def check(results):
+            results = list(results)
+            self.assertEqual(len(results), len(values))
+            for index, error in enumerate(results):
+                if index % 2:
+                    self.assertIsInstance(error, JSONSchemaValidationError)
+                    self.assertTrue(error.error_map)
+                else:
+                    self.assertIsNone(error)
+
+        # results are yielded lazily
+        results = validator.validate_many(iter(values))
+        self.assertIsNone(next(results))
+        check([None] + list(results))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            check(validator.validate_many(values, executor=executor, chunk_size=3))
+            # a batch smaller than a chunk
+            self.assertEqual(
+                list(validator.validate_many([[1]], executor=executor)), [None]
+            )
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=2, mp_context=mp_context) as executor:
+                check(validator.validate_many(values, executor=executor, chunk_size=7))
+
+    def test_avalidate(self):
+        schema = {'type': 'array', 'items': {'type': 'integer'}}
+        threads = []
+
+        class Validator(JSONSchemaValidator):
+            def validate(self, value, initial=None):
+                threads.append(threading.get_ident())
+                super().validate(value, initial)
+
+        validator = Validator(schema)
+
+        # small data is validated in the event loop's thread
+        asyncio.run(validator.avalidate([1, 2], threshold=5))
+        self.assertEqual(threads, [threading.get_ident()])
+
+        with self.assertRaises(JSONSchemaValidationError):
+            asyncio.run(validator.avalidate(['a'], threshold=5))
+
+        # large data is validated in the executor
+        threads.clear()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            asyncio.run(validator.avalidate(list(range(10)), executor=executor, threshold=5))
+            self.assertNotEqual(threads, [threading.get_ident()])
+
+            with self.assertRaises(JSONSchemaValidationError) as cm:
+                asyncio.run(validator.avalidate(['a'] * 10, executor=executor, threshold=5))
+            self.assertEqual(len(cm.exception.error_map), 10)
+
+        # the loop's default executor
+        threads.clear()
+        with override_settings(DJANGO_JSONFORM={'ASYNC_VALIDATION_THRESHOLD': 5}):
+            asyncio.run(validator.avalidate(list(range(10))))
+        self.assertNotEqual(threads, [threading.get_ident()])
+
+    def test_avalidate_keeps_context(self):
+        schema = {'type': 'array', 'items': {'type': 'integer'}}
+        languages = []
+
+        class Validator(JSONSchemaValidator):
+            def validate(self, value, initial=None):
+                languages.append(translation.get_language())
+                super().validate(value, initial)
+
+        validator = Validator(schema)
+
+        async def validate(**kwargs):
+            with translation.override('de'):
+                await validator.avalidate(list(range(10)), threshold=5, **kwargs)
+
+        # the loop's default executor
+        asyncio.run(validate())
+        self.assertEqual(languages, ['de'])
+
+        languages.clear()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            asyncio.run(validate(executor=executor))
+        self.assertEqual(languages, ['de'])
+
+    def test_validator_can_be_pickled(self):
+        validator = JSONSchemaValidator({'type': 'array', 'items': {'type': 'integer'}}, max_errors=1)
+        validator.compile()
+
+        copied = pickle.loads(pickle.dumps(validator))
+        self.assertEqual(copied, validator)
+        self.assertIsNone(copied.compiled_schema)
+        self.assertRaises(JSONSchemaValidationError, copied, ['a'])
+
+        error = pickle.loads(pickle.dumps(validator.get_error(['a', 'b'])))
+        self.assertEqual(list(error.error_map.keys()), ['0'])
+        self.assertTrue(error.error_map.truncated)
+
+    def test_iterative_engine(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'name': {'type': 'string', 'required': True},
+                'tags': {'type': 'array', 'items': {'type': 'integer'}, 'uniqueItems': True, 'maxItems': 3},
+                'pet': {'anyOf': [{'type': 'string'}, {'type': 'number'}]},
+                'children': {'type': 'array', 'items': {'$ref': '#'}},
+            },
+            'allOf': [{'properties': {'name': {'type': 'string', 'maxLength': 4}}}],
+            'additionalProperties': True
+        }
+        datas = [
+            {'name': 'john', 'tags': [1, 2], 'pet': 'dog', 'children': []},
+            {
+                'name': '', 'tags': [1, 1, 'a', 4], 'pet': 'dog', 'extra': 1,
+                'children': [{'name': 'too long', 'tags': [], 'pet': 1, 'children': []}]
+            },
+        ]
+
+        for data in datas:
+            error_maps = []
+            for engine in ('recursive', 'iterative'):
+                try:
+                    JSONSchemaValidator(schema, engine=engine)(data)
+                except JSONSchemaValidationError as e:
+                    error_maps.append(list(e.error_map.items()))
+                else:
+                    error_maps.append(None)
+            self.assertEqual(error_maps[0], error_maps[1])
+
+        self.assertRaises(ValueError, JSONSchemaValidator, schema, engine='unknown')
+
+    def test_iterative_engine_validates_deeply_nested_data(self):
+        schema = {
+            'type': 'array',
+            'items': {'$ref': '#/$defs/list'},
+            '$defs': {'list': {'type': 'array', 'items': {'$ref': '#/$defs/list'}}}
+        }
+        data = []
+        for i in range(5000):
+            data = [data]
+
+        validator = JSONSchemaValidator(schema, engine='iterative')
+        validator(data)
+
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'nested too deeply'):
+            JSONSchemaValidator(schema, engine='iterative', max_depth=100)(data)
+
+        with override_settings(DJANGO_JSONFORM={'VALIDATOR_ENGINE': 'iterative'}):
+            JSONSchemaValidator(schema)(data)
+
+    def test_iterative_engine_validates_deeply_nested_unions(self):
+        schema = {
+            'type': 'object',
+            'properties': {'child': {'$ref': '#/$defs/node'}},
+            '$defs': {
+                'node': {
+                    'oneOf': [
+                        {'type': 'object', 'properties': {'child': {'$ref': '#/$defs/node'}}},
+                        {'type': 'string'},
+                        {'type': 'array', 'items': {'anyOf': [{'type': 'integer', 'minimum': 0}, {'type': 'string'}]}},
+                    ]
+                }
+            }
+        }
+
+        def make_tree(depth, leaf):
+            data = leaf
+            for i in range(depth):
+                data = {'child': data}
+            return data
+
+        validator = JSONSchemaValidator(schema, engine='iterative')
+        validator(make_tree(2000, 'a'))
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(make_tree(2000, [-1]))
+        self.assertEqual(list(cm.exception.error_map.keys()), ['child'])
+
+        # same results as the recursive engine
+        datas = [make_tree(3, leaf) for leaf in ('a', 1, [1, 'a'], [-1], ['a', None], [], None)]
+        for options in ({}, {'max_errors': 1}, {'max_nodes': 50}):
+            for data in datas:
+                error_maps = []
+                for engine in ('recursive', 'iterative'):
+                    try:
+                        JSONSchemaValidator(schema, engine=engine, **options)(data)
+                    except JSONSchemaValidationError as e:
+                        error_maps.append(list(e.error_map.items()) if e.error_map else e.messages)
+                    else:
+                        error_maps.append(None)
+                self.assertEqual(error_maps[0], error_maps[1])
+
+        # limits still fail the whole data
+        with self.assertRaisesRegex(JSONSchemaValidationError, 'too large'):
+            JSONSchemaValidator(schema, engine='iterative', max_nodes=100)(make_tree(200, 'a'))
 
     def test_get_ref_method(self):
         pass
 
+    def test_validation_does_not_modify_schema(self):
+        schema = {
+            'type': 'object',
+            'properties': {
+                'a': {'$ref': '#/$defs/name'},
+                'b': {
+                    'oneOf': [
+                        {
+                            'properties': {'x': {'type': 'string'}},
+                            'additionalProperties': {'type': 'number'}
+                        }
+                    ]
+                },
+                'c': {
+                    'anyOf': [
+                        {
+                            'properties': {'y': {'type': 'string'}},
+                            'additionalProperties': {'type': 'number'}
+                        }
+                    ]
+                },
+            },
+            'required': ['a'],
+            '$defs': {'name': {'type': 'string'}}
+        }
+        original_schema = copy.deepcopy(schema)
+
+        validator = JSONSchemaValidator(schema)
+        validator({'a': 'john', 'b': {'x': 'hello'}, 'c': {'y': 'world'}})
+        self.assertRaises(JSONSchemaValidationError, validator, {'a': '', 'b': {}, 'c': {}})
+
+        self.assertEqual(schema, original_schema)
+
     def test_doesn_crash_when_schema_type_is_an_array(self):
         schema = {
             'type': 'object',
@@ -149,6 +628,30 @@ class TestJSONSchemaValidator(TestCase):
         validator(data_1) # must pass
         validator(data_2) # must pass
 
+        # 4. dict items with keys in different order
+        schema = {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'a': {'type': 'integer'},
+                    'b': {'type': 'integer'}
+                }
+            },
+            'uniqueItems': True
+        }
+        wrong_data = [{'a': 1, 'b': 2}, {'a': 2, 'b': 2}, {'b': 2, 'a': 1}]
+        validator = JSONSchemaValidator(schema)
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(wrong_data)
+        self.assertEqual(
+            cm.exception.error_map,
+            {
+                '': ['All items in this list must be unique.'],
+                '2': ['This item is a duplicate of item 1.'],
+            }
+        )
+
     def test_validate_array_choices(self):
         # 1. plain choices
         schema = {
@@ -357,6 +860,35 @@ class TestJSONSchemaValidator(TestCase):
         self.assertRaises(JSONSchemaValidationError, validator, wrong_data)
         validator(data)
 
+    def test_union_errors(self):
+        schema = {
+            'type': 'array',
+            'items': {
+                'oneOf': [
+                    {'type': 'object', 'properties': {'name': {'type': 'string', 'maxLength': 3}}},
+                ]
+            }
+        }
+
+        # the errors of the only candidate branch are reported
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema)([{'name': 'long'}, {'name': 'ok'}, {'name': 'long'}])
+        self.assertEqual(
+            list(cm.exception.error_map.keys()),
+            [join_coords(0, 'name'), join_coords(2, 'name')]
+        )
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema, max_errors=1)([{'name': 'long'}, {'name': 'long'}])
+        self.assertEqual(list(cm.exception.error_map.keys()), [join_coords(0, 'name')])
+        self.assertTrue(cm.exception.error_map.truncated)
+
+        # data matching none of the branches is an error of the item
+        schema['items']['oneOf'].append({'type': 'string'})
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            JSONSchemaValidator(schema, fail_fast=True)([1, 2])
+        self.assertEqual(list(cm.exception.error_map.keys()), ['0'])
+
     def test_object_oneOf(self):
         """Tests for oneOf keyword on the object level."""
 
@@ -1216,6 +1748,7 @@ class TestJSONSchemaValidator(TestCase):
         # 5. test maxLength when zero
         schema['properties']['a']['maxLength'] = 0
         wrong_data = {'a': '123456'}
+        validator = JSONSchemaValidator(schema)
         self.assertRaises(JSONSchemaValidationError, validator, wrong_data)
 
         # 6. minLength should be ignore if field is not required and is empty
@@ -1223,15 +1756,77 @@ class TestJSONSchemaValidator(TestCase):
         schema['properties']['a']['minLength'] = 3
         schema['properties']['a']['required'] = False
         data = {'a': ''}
+        validator = JSONSchemaValidator(schema)
         validator(data)
 
         # 7. test choices
         schema['properties']['a']['choices'] = ['one', 'two ']
         wrong_data = {'a': 'xxx'}
         data = {'a': 'two '}  # White space in choices is valid
+        validator = JSONSchemaValidator(schema)
         self.assertRaises(JSONSchemaValidationError, validator, wrong_data)
         validator(data)
 
+    def test_validate_string_pattern(self):
+        schema = {
+            'type': 'array',
+            'items': {'type': 'string', 'pattern': '^[A-Z]{3}-\\d+$'}
+        }
+        validator = JSONSchemaValidator(schema)
+        validator(['ABC-1', 'XYZ-123'])
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator(['ABC-1', 'abc-1', 'ABCD-1'])
+        self.assertEqual(
+            cm.exception.error_map,
+            {
+                '1': ['This value does not match the required pattern.'],
+                '2': ['This value does not match the required pattern.'],
+            }
+        )
+
+        # pattern is not anchored by default
+        JSONSchemaValidator({'type': 'array', 'items': {'type': 'string', 'pattern': 'b'}})(['abc'])
+
+        # regex is compiled once
+        self.assertIs(validator.compile().items.pattern, JSONSchemaValidator(schema).compile().items.pattern)
+
+        # invalid regex
+        self.assertRaisesRegex(
+            JSONSchemaValidationError,
+            'Invalid regular expression',
+            JSONSchemaValidator({'type': 'array', 'items': {'type': 'string', 'pattern': '['}}),
+            []
+        )
+
+    def test_object_patternProperties(self):
+        schema = {
+            'type': 'object',
+            'properties': {'x-id': {'type': 'string'}},
+            'patternProperties': {
+                '^x-': {'type': 'string', 'maxLength': 3},
+                'count$': {'type': 'integer'},
+            },
+            'additionalProperties': {'type': 'boolean'}
+        }
+        validator = JSONSchemaValidator(schema)
+        validator({'x-id': 'abc', 'x-name': 'abc', 'count': 1, 'total_count': 2, 'active': True})
+
+        # a key must match all the matching patterns
+        self.assertRaises(JSONSchemaValidationError, validator, {'x-id': 'a', 'x-count': '1'})
+
+        with self.assertRaises(JSONSchemaValidationError) as cm:
+            validator({'x-id': 'abcd', 'x-name': 'abcd', 'count': '1', 'active': 1})
+        self.assertEqual(
+            cm.exception.error_map,
+            {
+                'x-id': ['Maximum length must be 3'],
+                'x-name': ['Maximum length must be 3'],
+                'count': ['Invalid value. Only numbers allowed.'],
+                'active': ['Invalid value.'],
+            }
+        )
+
     def test_validate_string_formats(self):
         # 1. email
         schema = {
@@ -1434,6 +2029,7 @@ class TestJSONSchemaValidator(TestCase):
         schema['properties']['a']['choices'] = [1, 2]
         wrong_data = {'a': 3}
         data = {'a': 1}
+        validator = JSONSchemaValidator(schema)
         self.assertRaises(JSONSchemaValidationError, validator, wrong_data)
         validator(data)
 
@@ -1560,9 +2156,37 @@ class TestJSONSchemaValidator(TestCase):
         schema['properties']['a']['choices'] = [1, 2]
         wrong_data = {'a': 3}
         data = {'a': 1}
+        validator = JSONSchemaValidator(schema)
         self.assertRaises(JSONSchemaValidationError, validator, wrong_data)
         validator(data)
 
+    def test_validate_number_multipleOf(self):
+        """multipleOf check must be exact for decimal values"""
+        cases = [
+            # (multipleOf, valid values, invalid values)
+            (0.01, [0.07, 1.1, 19.99, 0.3, 100, 0, -0.05], [0.001, 1.005, 0.015]),
+            (0.001, [1.005, 0.123, 7], [0.0005, 1.0001]),
+            (0.1, [0.3, 0.7, 2], [0.25]),
+            (2.5, [5, 7.5, -2.5], [1, 6]),
+            (3, [0, 9, -3, 3.0, 3 * 10 ** 20], [1, 4.5, 10, float('nan'), float('inf')]),
+        ]
+
+        for multiple_of, valid_values, invalid_values in cases:
+            schema = {'type': 'array', 'items': {'type': 'number', 'multipleOf': multiple_of}}
+            validator = JSONSchemaValidator(schema)
+
+            validator(valid_values)
+            for value in valid_values:
+                validator([value])
+
+            for value in invalid_values:
+                self.assertRaises(JSONSchemaValidationError, validator, [value])
+
+            # batch of integers
+            with self.assertRaises(JSONSchemaValidationError) as cm:
+                validator(valid_values + invalid_values)
+            self.assertEqual(len(cm.exception.error_map), len(invalid_values))
+
     def test_validate_const_method(self):
         schema = {
             'type': 'object',